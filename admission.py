@@ -0,0 +1,273 @@
+"""Admission control shared by the Flask (app.py) and ASGI (asgi.py) fronts.
+
+All limits come from environment variables so they can be tuned per deploy:
+
+    MAX_UPLOAD_MB        largest accepted upload                       (413)
+    MAX_ROSTER_MB        largest roster once a gzip upload is unpacked (413)
+    MAX_CANDIDATES       most roster rows per request                  (413)
+    MAX_CONCURRENT_JOBS  generations running at once (see the gates below)
+    MAX_QUEUED_JOBS      requests allowed to wait for a free slot      (429 when full)
+    QUEUE_TIMEOUT        seconds a queued request waits before giving up (429)
+    JOB_CPU_SECONDS      CPU time one generation may use               (413)
+    JOB_MEMORY_MB        extra resident memory one generation may use  (413)
+
+Setting a limit to 0 switches it off. The CPU budget needs POSIX rlimits and
+the memory budget Linux's /proc; where those are missing (macOS has no /proc,
+Windows has neither) that budget is skipped rather than failing the job.
+"""
+import _thread
+import asyncio
+import math
+import os
+import signal
+import threading
+import time
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows
+    fcntl = resource = None
+
+
+def _env_number(name, default, cast=int):
+    value = os.environ.get(name)
+    return cast(value) if value not in (None, "") else default
+
+
+MAX_UPLOAD_BYTES = int(_env_number("MAX_UPLOAD_MB", 5, float) * 1024 * 1024)
+MAX_ROSTER_BYTES = int(_env_number("MAX_ROSTER_MB", 50, float) * 1024 * 1024)
+MAX_CANDIDATES = _env_number("MAX_CANDIDATES", 500)
+MAX_CONCURRENT_JOBS = _env_number("MAX_CONCURRENT_JOBS", os.cpu_count() or 1)
+MAX_QUEUED_JOBS = _env_number("MAX_QUEUED_JOBS", 8)
+QUEUE_TIMEOUT = _env_number("QUEUE_TIMEOUT", 15.0, float)
+JOB_CPU_SECONDS = _env_number("JOB_CPU_SECONDS", 120)
+JOB_MEMORY_MB = _env_number("JOB_MEMORY_MB", 1024)
+JOB_GATE_FOLDER = os.environ.get("JOB_GATE_FOLDER", "/tmp/outputs/job_gate")
+
+
+class AdmissionRejected(Exception):
+    """A request that can't be (or can no longer be) served within the limits."""
+    def __init__(self, message, status=429):
+        super().__init__(message)
+        self.status = status
+
+    def __reduce__(self):
+        return (AdmissionRejected, (str(self), self.status))
+
+
+# --- SIZE CHECKS ---
+def check_upload_size(num_bytes):
+    if MAX_UPLOAD_BYTES and num_bytes > MAX_UPLOAD_BYTES:
+        raise AdmissionRejected(
+            f"Upload too large: limit is {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB.", 413)
+
+
+def check_candidate_count(count):
+    if MAX_CANDIDATES and count > MAX_CANDIDATES:
+        raise AdmissionRejected(
+            f"Too many candidates: {count} rows, limit is {MAX_CANDIDATES} per request.", 413)
+
+
+# --- CONCURRENCY GATES ---
+# A gate lets `max_active` jobs run and up to `max_waiting` more queue for a
+# slot. Anything beyond that is turned away straight away instead of piling up.
+# JobGate and AsyncJobGate count within one process: right for the ASGI front
+# (one event loop feeding its own pool) and threaded servers. gunicorn's sync
+# workers each serve one request at a time, so the Flask app uses
+# SharedJobGate, which counts across every worker process on the host.
+GATE_POLL_INTERVAL = 0.05
+SHARED_GATE_SUPPORTED = fcntl is not None
+
+def _busy():
+    return AdmissionRejected("Server is busy generating other forms. Please try again shortly.", 429)
+
+
+class JobGate:
+    """Thread-based gate for the sync Flask app."""
+    def __init__(self, max_active=MAX_CONCURRENT_JOBS, max_waiting=MAX_QUEUED_JOBS, timeout=QUEUE_TIMEOUT):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            if self.active >= self.max_active:
+                if self.waiting >= self.max_waiting:
+                    raise _busy()
+                self.waiting += 1
+                try:
+                    admitted = self._cond.wait_for(lambda: self.active < self.max_active, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    raise _busy()
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class SharedJobGate:
+    """JobGate's rules across processes, with flock'd slot files in `folder`.
+
+    A running job holds one of `max_active` "active" files locked, a queued one
+    one of `max_waiting` "waiting" files while it polls for an active slot. The
+    kernel drops a dead worker's locks, so a crash can't leak a slot. Queued
+    requests are admitted in no particular order.
+    """
+    def __init__(self, folder=JOB_GATE_FOLDER, max_active=MAX_CONCURRENT_JOBS, max_waiting=MAX_QUEUED_JOBS,
+                 timeout=QUEUE_TIMEOUT):
+        self.folder = folder
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._held = threading.local()
+
+    def _lock_any(self, kind, count):
+        os.makedirs(self.folder, exist_ok=True)
+        for i in range(count):
+            fd = os.open(os.path.join(self.folder, f"{kind}-{i}"), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def __enter__(self):
+        fd = self._lock_any("active", self.max_active)
+        if fd is None:
+            ticket = self._lock_any("waiting", self.max_waiting)
+            if ticket is None:
+                raise _busy()
+            try:
+                deadline = time.monotonic() + self.timeout
+                while fd is None:
+                    if time.monotonic() >= deadline:
+                        raise _busy()
+                    time.sleep(GATE_POLL_INTERVAL)
+                    fd = self._lock_any("active", self.max_active)
+            finally:
+                os.close(ticket)
+        self._held.fd = fd
+        return self
+
+    def __exit__(self, *exc):
+        os.close(self._held.fd)  # closing the file releases its lock
+
+
+class AsyncJobGate:
+    """Same rules as JobGate, for the ASGI event loop."""
+    def __init__(self, max_active=MAX_CONCURRENT_JOBS, max_waiting=MAX_QUEUED_JOBS, timeout=QUEUE_TIMEOUT):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._cond = None
+
+    async def __aenter__(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            if self.active >= self.max_active:
+                if self.waiting >= self.max_waiting:
+                    raise _busy()
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: self.active < self.max_active), self.timeout)
+                except asyncio.TimeoutError:
+                    raise _busy()
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+# --- PER-JOB BUDGETS ---
+# CPU: the soft RLIMIT_CPU is raised to "CPU used so far + budget" for one job
+# and put back afterwards, so a long-lived worker can run many jobs; the kernel
+# sends SIGXCPU when it runs out.
+# Memory: a watchdog thread polls resident memory and interrupts the job with
+# the same signal once it grows past the budget. (A hard RLIMIT_AS can abort
+# the interpreter if an allocation fails in the wrong place.)
+# Python signal handlers only run on the main thread, so budgets are skipped
+# when called from anywhere else (e.g. threaded workers).
+MEMORY_POLL_INTERVAL = 0.05
+
+# Both budgets interrupt the job with SIGXCPU
+CPU_BUDGET_SUPPORTED = resource is not None and hasattr(resource, "RLIMIT_CPU") and hasattr(signal, "SIGXCPU")
+MEMORY_BUDGET_SUPPORTED = (resource is not None and hasattr(signal, "SIGXCPU")
+                           and os.path.exists("/proc/self/statm"))
+
+
+class _BudgetExceeded(BaseException):
+    # BaseException so the processors' `except Exception` handlers can't swallow it
+    pass
+
+
+def _on_budget_signal(signum, frame):
+    raise _BudgetExceeded()
+
+
+def _resident_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def _watch_memory(limit_bytes, stop, tripped):
+    while not stop.wait(MEMORY_POLL_INTERVAL):
+        if _resident_bytes() > limit_bytes:
+            tripped.set()
+            _thread.interrupt_main(signal.SIGXCPU)
+            return
+
+
+def run_with_budget(func, *args):
+    cpu_seconds = JOB_CPU_SECONDS if CPU_BUDGET_SUPPORTED else 0
+    memory_mb = JOB_MEMORY_MB if MEMORY_BUDGET_SUPPORTED else 0
+    if threading.current_thread() is not threading.main_thread() or not (cpu_seconds or memory_mb):
+        return func(*args)
+
+    old_cpu = resource.getrlimit(resource.RLIMIT_CPU) if cpu_seconds else None
+    old_handler = signal.signal(signal.SIGXCPU, _on_budget_signal)
+    stop, tripped = threading.Event(), threading.Event()
+    watchdog = None
+    try:
+        if cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = math.ceil(usage.ru_utime + usage.ru_stime) + cpu_seconds
+            if old_cpu[1] != resource.RLIM_INFINITY:
+                soft = min(soft, old_cpu[1])
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, old_cpu[1]))
+        if memory_mb:
+            limit = _resident_bytes() + memory_mb * 1024 * 1024
+            watchdog = threading.Thread(target=_watch_memory, args=(limit, stop, tripped), daemon=True)
+            watchdog.start()
+        return func(*args)
+    except _BudgetExceeded:
+        if tripped.is_set():
+            raise AdmissionRejected(
+                f"Roster needed more than {JOB_MEMORY_MB} MB to generate. Split it into smaller uploads.", 413)
+        raise AdmissionRejected(
+            f"Roster took more than {JOB_CPU_SECONDS}s of CPU to generate. Split it into smaller uploads.", 413)
+    finally:
+        stop.set()
+        if watchdog is not None:
+            watchdog.join()
+        if old_cpu is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, old_cpu)
+        signal.signal(signal.SIGXCPU, old_handler)
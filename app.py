@@ -1,56 +1,236 @@
-from flask import Flask, render_template, request, send_file
-import pandas as pd
 import os
-import zipfile
 import shutil
+import tempfile
+import zipfile
+from collections import namedtuple
+
+import pandas as pd
+from flask import Flask, render_template, request, send_file, after_this_request, jsonify, url_for
+
+from admission import (AdmissionRejected, JobGate, MAX_CANDIDATES, MAX_UPLOAD_BYTES, SHARED_GATE_SUPPORTED, SharedJobGate,
+                       check_candidate_count, run_with_budget)
+from archive_store import (ARCHIVE_SHARED, ARCHIVE_TTL, DOWNLOAD_NAME, archive_etag, archive_path, remaining_ttl, remove_expired,
+                           start_sweeper, store_archive)
 from form_logic import process_efa, process_bronze_med, process_bronze_cross, process_bronze_star, process_sfa, process_airway_management, process_national_lifeguard, process_leadership_mastersheet, process_nl_recert
+from form_logic import bytes_saved, pages_saved, render_batches
+from form_logic import plan_efa, plan_bronze_med, plan_bronze_cross, plan_bronze_star, plan_sfa, plan_airway_management, plan_national_lifeguard, plan_leadership_mastersheet, plan_nl_recert
+from incremental_writer import load_template
+from profiling import ProfileNotAllowed, generate_profiled, requested_profile_mode
+from roster_io import ROSTER_COLUMNS, RosterError, read_roster
+from roster_share import RosterHandle, read_packed
+from xfdf_export import export_batches
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES or None
 
 # Configuration
 UPLOAD_FOLDER = '/tmp/outputs'
 TEMPLATE_FOLDER = 'templates_pdf'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(TEMPLATE_FOLDER, exist_ok=True)
+remove_expired()  # archives left behind by an earlier run
 
 # Map drop-down values to filenames and functions
+# ("plan" maps a roster onto the sheets without rendering; "func" renders it)
 FORM_CONFIG = {
     "efa": {
         "filename": "95efa_on2014.pdf",
-        "func": process_efa
+        "func": process_efa,
+        "plan": plan_efa
     },
     "bronze_med": {
         "filename": "95tsbronzemedallion2020_fillable.pdf",
-        "func": process_bronze_med
+        "func": process_bronze_med,
+        "plan": plan_bronze_med
     },
     "bronze_cross": {
         "filename": "95tsbronzecross2020_fillable.pdf",
-        "func": process_bronze_cross
+        "func": process_bronze_cross,
+        "plan": plan_bronze_cross
     },
     "bronze_star": {
         "filename": "95tsbronzestar2020_fillable.pdf",
-        "func": process_bronze_star
+        "func": process_bronze_star,
+        "plan": plan_bronze_star
     },
     "sfa": {
         "filename": "95on_sfa_test_sheet-20231121-fillable.pdf",
-        "func": process_sfa
+        "func": process_sfa,
+        "plan": plan_sfa
     },
     "airway_management": {
         "filename": "95airwaymanagement2022-fillable.pdf",
-        "func": process_airway_management
+        "func": process_airway_management,
+        "plan": plan_airway_management
     },
     "national_lifeguard": {
         "filename": "95nlpool 2022_tsfillable 20250819 x.pdf",
-        "func": process_national_lifeguard
+        "func": process_national_lifeguard,
+        "plan": plan_national_lifeguard
     },
-    "nl_recert": { "filename": "95nlpoolrecert 2025_fillable 20250820 x.pdf", "func": process_nl_recert },
+    "nl_recert": { "filename": "95nlpoolrecert 2025_fillable 20250820 x.pdf", "func": process_nl_recert, "plan": plan_nl_recert },
 
     "leadership_mastersheet": {
         "filename": "leadershipmastersheet_on_20250219_fillable.pdf",
-        "func": process_leadership_mastersheet
+        "func": process_leadership_mastersheet,
+        "plan": plan_leadership_mastersheet
     }
 }
 
+def preload_templates():
+    """Parses and indexes every FORM_CONFIG template in this process.
+
+    Called in the gunicorn master (see gunicorn.conf.py) so forked workers
+    share the parsed templates copy-on-write and the mmapped template bytes
+    through the page cache, instead of each building its own on first use.
+    """
+    for config in FORM_CONFIG.values():
+        template_path = os.path.join(TEMPLATE_FOLDER, config['filename'])
+        if os.path.exists(template_path):
+            load_template(template_path).resolve_all()
+
+
+class FormJobError(Exception):
+    """Raised by generate_forms with the message/status the endpoint should return."""
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+    def __reduce__(self):
+        # Keep the status when the error crosses a process boundary
+        return (FormJobError, (str(self), self.status))
+
+
+def load_roster(roster_source, form_type):
+    """Reads and checks the roster and looks up the form; returns (df, config).
+
+    roster_source may also be a DataFrame this already returned, which is only
+    checked again, or a roster_share.RosterHandle to one (the ASGI pool's jobs).
+    """
+    try:
+        if isinstance(roster_source, pd.DataFrame):
+            df = roster_source
+        elif isinstance(roster_source, RosterHandle):
+            df = read_packed(roster_source)
+        else:
+            df = read_roster(roster_source)
+    except AdmissionRejected:
+        raise
+    except RosterError as e:
+        raise FormJobError(str(e), 400)
+    except Exception as e:
+        raise FormJobError(f"Error reading roster: {str(e)}", 500)
+
+    check_candidate_count(len(df))
+
+    config = FORM_CONFIG.get(form_type)
+    if config is None:
+        raise FormJobError(f"Unknown form type: {form_type}", 400)
+    return df, config
+
+
+OUTPUT_FORMATS = ("pdf", "xfdf")
+
+# What generate_forms hands back: the ZIP and what the page planner left out
+GeneratedForms = namedtuple("GeneratedForms", "zip_path pages_saved bytes_saved")
+
+
+def generate_forms(roster, form_type, work_folder, output_format="pdf"):
+    """Reads the roster, runs the selected processor and returns a GeneratedForms.
+
+    roster is an upload path, the DataFrame load_roster returned for it or a
+    roster_share handle to that DataFrame. The
+    endpoints read it before queueing, so an oversized roster is turned away
+    without waiting for (or taking) a generation slot.
+
+    output_format "xfdf" zips one data-only XFDF per sheet plus a manifest
+    instead of the filled PDFs (see xfdf_export.py). pages_saved/bytes_saved
+    report the template pages the plan left out of the sheets (see
+    form_logic.pages_saved and bytes_saved).
+    Kept free of any request objects so it can run in a worker process.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise FormJobError(f"Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}.", 400)
+
+    # 1. Read the roster (CSV, XLSX or Parquet, optionally gzipped)
+    df, config = load_roster(roster, form_type)
+
+    # 2. Get Template Path
+    template_path = os.path.join(TEMPLATE_FOLDER, config['filename'])
+
+    if not os.path.exists(template_path):
+        raise FormJobError(f"Template PDF not found: {config['filename']}. Please put it in the templates_pdf folder.", 500)
+
+    # 3. Run the Processor Logic
+    run_folder = os.path.join(work_folder, "generated_files")
+    if os.path.exists(run_folder): shutil.rmtree(run_folder)
+    os.makedirs(run_folder)
+
+    try:
+        batches = config['plan'](df)
+        if output_format == "xfdf":
+            generated_files = export_batches(batches, template_path, run_folder, form_type)
+            saved_bytes = 0  # no PDF is written
+        else:
+            generated_files = render_batches(batches, template_path, run_folder)
+            saved_bytes = bytes_saved(batches, template_path)
+    except Exception as e:
+        raise FormJobError(f"Error processing PDF: {str(e)}", 500)
+
+    # 4. Zip the results
+    zip_path = os.path.join(work_folder, "Filled_Forms.zip")
+    with zipfile.ZipFile(zip_path, 'w') as zipf:
+        for generated in generated_files:
+            zipf.write(generated, os.path.basename(generated))
+
+    return GeneratedForms(zip_path, pages_saved(batches), saved_bytes)
+
+
+def preview_forms(roster_source, form_type):
+    """Dry run: the batches generate_forms would render, as JSON-ready data.
+
+    Same normalization and slot mapping as the processors (FORM_CONFIG "plan"),
+    but no PDF is opened, so it answers in milliseconds.
+    """
+    df, config = load_roster(roster_source, form_type)
+    try:
+        batches = config['plan'](df)
+    except Exception as e:
+        raise FormJobError(f"Error mapping roster: {str(e)}", 500)
+
+    return {
+        "form_type": form_type,
+        "candidates": len(df),
+        "files": len(batches),
+        "pages_saved": pages_saved(batches),
+        "batches": [
+            {
+                "filename": batch["filename"],
+                "slots": batch["slots"],
+                "data_map": batch["data_map"],
+                "drop_pages": list(batch["drop_pages"]),
+            }
+            for batch in batches
+        ],
+    }
+
+
+# Generations allowed to run at once across every worker process on this host
+# (gunicorn's sync workers can't see each other's threads); per process where
+# flock is missing (see admission.py)
+job_gate = SharedJobGate() if SHARED_GATE_SUPPORTED else JobGate()
+
+
+def rejection_response(e):
+    headers = {"Retry-After": "10"} if e.status == 429 else {}
+    return str(e), e.status, headers
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return f"Upload too large: limit is {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB.", 413
+
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -60,48 +240,118 @@ def index():
         
         file = request.files['csv_file']
         form_type = request.form.get('form_type')
+        output_format = request.form.get('output_format') or 'pdf'
         
         if file.filename == '' or not form_type:
             return "Missing file or selection", 400
 
-        # 2. Save CSV temporarily
-        csv_path = os.path.join(UPLOAD_FOLDER, "temp_roster.csv")
-        file.save(csv_path)
-
-        # 3. Read CSV
         try:
-            df = pd.read_csv(csv_path, dtype=str).fillna("")
-        except Exception as e:
-            return f"Error reading CSV: {str(e)}", 500
+            profile_mode = requested_profile_mode(request.headers, request.args)
+        except ProfileNotAllowed as e:
+            return str(e), 403
 
-        # 4. Get Template Path
-        config = FORM_CONFIG.get(form_type)
-        template_path = os.path.join(TEMPLATE_FOLDER, config['filename'])
-        
-        if not os.path.exists(template_path):
-            return f"Template PDF not found: {config['filename']}. Please put it in the templates_pdf folder.", 500
+        # 2. Save the upload temporarily (own folder per request so workers don't collide)
+        work_folder = tempfile.mkdtemp(dir=UPLOAD_FOLDER)
+
+        @after_this_request
+        def cleanup(response):
+            shutil.rmtree(work_folder, ignore_errors=True)
+            return response
 
-        # 5. Run the Processor Logic
-        # Create a unique subfolder for this run to avoid conflicts
-        run_folder = os.path.join(UPLOAD_FOLDER, "generated_files")
-        if os.path.exists(run_folder): shutil.rmtree(run_folder)
-        os.makedirs(run_folder)
+        roster_path = os.path.join(work_folder, "temp_roster")
+        file.save(roster_path)
+
+        # 3. Read and check the roster first: a roster over the limits is
+        # refused now rather than after queueing for a slot
+        try:
+            df, _ = load_roster(roster_path, form_type)
+        except AdmissionRejected as e:
+            return rejection_response(e)
+        except FormJobError as e:
+            return str(e), e.status
 
+        # 4. Wait for a free slot, then fill the forms and zip them
+        job = (generate_forms, df, form_type, work_folder, output_format)
+        if profile_mode:
+            job = (generate_profiled, profile_mode, work_folder) + job
         try:
-            generated_pdfs = config['func'](df, template_path, run_folder)
-        except Exception as e:
-            return f"Error processing PDF: {str(e)}", 500
+            with job_gate:
+                generated = run_with_budget(*job)
+        except AdmissionRejected as e:
+            return rejection_response(e)
+        except FormJobError as e:
+            return str(e), e.status
+
+        # 5. Keep the ZIP for a while under an unguessable ID, so a dropped download can resume
+        archive_id = store_archive(generated.zip_path)
+        download_url = url_for('download', archive_id=archive_id)
+
+        # With a shared archive store (ARCHIVE_SHARED) the page asks for JSON and
+        # hands the URL to the browser's download manager
+        if request.accept_mimetypes.best_match(['application/zip', 'application/json']) == 'application/json':
+            return jsonify(download_url=download_url, expires_in=ARCHIVE_TTL,
+                           pages_saved=generated.pages_saved, bytes_saved=generated.bytes_saved), 201
+
+        response = send_archive(archive_id)
+        response.headers['Content-Location'] = download_url
+        response.headers.update(saved_headers(generated))
+        return response
+
+    return render_template('index.html', **page_context())
+
+
+def saved_headers(generated):
+    """Response headers reporting what the page planner left out of the ZIP's sheets."""
+    return {"X-Pages-Saved": str(generated.pages_saved), "X-Bytes-Saved": str(generated.bytes_saved)}
+
+
+def page_context():
+    """Values index.html needs; the roster checks in the page mirror the server's."""
+    return {
+        "archive_minutes": max(1, ARCHIVE_TTL // 60),
+        "download_links": ARCHIVE_SHARED,
+        "roster_columns": list(ROSTER_COLUMNS),
+        "max_candidates": MAX_CANDIDATES,
+    }
+
+
+def send_archive(archive_id):
+    path = archive_path(archive_id)
+    if path is None:
+        return "Download expired or not found. Please generate the forms again.", 404
+
+    # Werkzeug answers If-None-Match / If-Modified-Since / Range / If-Range from the file
+    response = send_file(path, as_attachment=True, download_name=DOWNLOAD_NAME,
+                         etag=archive_etag(archive_id), max_age=remaining_ttl(path))
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
+@app.route('/download/<archive_id>')
+def download(archive_id):
+    return send_archive(archive_id)
+
+
+@app.route('/preview', methods=['POST'])
+def preview():
+    if 'csv_file' not in request.files:
+        return "No file uploaded", 400
 
-        # 6. Zip the results
-        zip_path = os.path.join(UPLOAD_FOLDER, "Filled_Forms.zip")
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for pdf in generated_pdfs:
-                zipf.write(pdf, os.path.basename(pdf))
+    file = request.files['csv_file']
+    form_type = request.form.get('form_type')
 
-        # 7. Cleanup and Send
-        return send_file(zip_path, as_attachment=True)
+    if file.filename == '' or not form_type:
+        return "Missing file or selection", 400
 
-    return render_template('index.html')
+    # No PDF work, so no job slot or budget: parse straight from the upload
+    try:
+        return jsonify(preview_forms(file.stream, form_type))
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    except FormJobError as e:
+        return str(e), e.status
 
 if __name__ == '__main__':
+    start_sweeper()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""Short-lived storage for generated ZIPs, so a dropped download can resume.
+
+Each archive is kept under an unguessable ID (its URL is the only way to find
+it) for ARCHIVE_TTL seconds. The content under an ID never changes, so the
+ID doubles as a strong ETag, and the servers can answer conditional and Range
+requests from the file as-is.
+
+Old archives are removed whenever a new one is stored: first anything past
+its TTL, then the oldest ones until at most ARCHIVE_MAX_COUNT files and
+ARCHIVE_MAX_MB megabytes remain. An expired archive is also deleted when its
+link is used, and start_sweeper() deletes expired ones every
+ARCHIVE_SWEEP_INTERVAL seconds (and once at startup), so an idle server
+doesn't keep rosters on disk past the TTL. The folder is plain files, so every
+gunicorn worker and process-pool worker sees the same store.
+
+Separate instances (serverless functions, several hosts) each have their own
+/tmp, so a link may be followed on an instance that never stored the archive.
+Set ARCHIVE_SHARED=1 only when ARCHIVE_FOLDER is shared by every instance (a
+mounted volume); the upload page then downloads through the link instead of
+taking the ZIP from the POST response.
+"""
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+
+ARCHIVE_FOLDER = os.environ.get("ARCHIVE_FOLDER", "/tmp/outputs/archives")
+ARCHIVE_TTL = int(os.environ.get("ARCHIVE_TTL", "900"))
+ARCHIVE_MAX_COUNT = int(os.environ.get("ARCHIVE_MAX_COUNT", "100"))
+ARCHIVE_MAX_BYTES = int(float(os.environ.get("ARCHIVE_MAX_MB", "500")) * 1024 * 1024)
+ARCHIVE_SWEEP_INTERVAL = int(os.environ.get("ARCHIVE_SWEEP_INTERVAL", "60"))
+ARCHIVE_SHARED = os.environ.get("ARCHIVE_SHARED") == "1"
+DOWNLOAD_NAME = "Filled_Forms.zip"
+
+_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{32}$")
+
+
+def _path(archive_id):
+    return os.path.join(ARCHIVE_FOLDER, f"{archive_id}.zip")
+
+
+def store_archive(zip_path):
+    """Moves zip_path into the store and returns its new archive ID."""
+    os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+    archive_id = secrets.token_urlsafe(24)  # 32 URL-safe characters, 192 random bits
+    # A rename when the work folder is on the same filesystem (the default)
+    shutil.move(zip_path, _path(archive_id))
+    prune_archives(keep=archive_id)
+    return archive_id
+
+
+def archive_path(archive_id):
+    """Path of a live archive, or None if the ID is malformed, unknown or expired."""
+    if not _ID_PATTERN.match(archive_id):
+        return None
+    path = _path(archive_id)
+    try:
+        if time.time() - os.stat(path).st_mtime > ARCHIVE_TTL:
+            _remove(path)
+            return None
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def archive_etag(archive_id):
+    return archive_id
+
+
+def remaining_ttl(path):
+    return max(0, int(ARCHIVE_TTL - (time.time() - os.stat(path).st_mtime)))
+
+
+def _remove(path):
+    try:
+        os.remove(path)  # a download already in progress keeps its open file
+    except FileNotFoundError:
+        pass  # another worker got there first
+
+
+def prune_archives(keep=None):
+    now = time.time()
+    archives = []
+    for entry in os.scandir(ARCHIVE_FOLDER):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > ARCHIVE_TTL:
+            _remove(entry.path)
+        else:
+            archives.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # Oldest first; the archive just stored is never the one evicted
+    archives.sort()
+    keep_path = _path(keep) if keep else None
+    count = len(archives)
+    total = sum(size for _, size, _ in archives)
+    for _, size, path in archives:
+        if count <= ARCHIVE_MAX_COUNT and total <= ARCHIVE_MAX_BYTES:
+            break
+        if path == keep_path:
+            continue
+        _remove(path)
+        count -= 1
+        total -= size
+
+
+def remove_expired():
+    """Deletes every archive past its TTL."""
+    now = time.time()
+    try:
+        entries = list(os.scandir(ARCHIVE_FOLDER))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime > ARCHIVE_TTL:
+                _remove(entry.path)
+        except FileNotFoundError:
+            continue
+
+
+_sweeper_pid = None
+
+
+def _sweep():
+    while True:
+        try:
+            remove_expired()
+        except OSError:
+            pass  # try again next round
+        time.sleep(ARCHIVE_SWEEP_INTERVAL)
+
+
+def start_sweeper():
+    """Starts the background thread that deletes expired archives, once per process."""
+    global _sweeper_pid
+    # A forked worker inherits the flag but not the thread
+    if _sweeper_pid == os.getpid():
+        return
+    _sweeper_pid = os.getpid()
+    threading.Thread(target=_sweep, name="archive-sweeper", daemon=True).start()
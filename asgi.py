@@ -0,0 +1,241 @@
+"""ASGI front for the automator.
+
+Serves the same page and upload form as app.index, but the upload is
+received and the ZIP is streamed back on the event loop, so a slow phone on
+pool-deck Wi-Fi only costs an open socket. The CPU-heavy form_logic work is
+handed to a fixed-size process pool.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+"""
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+from werkzeug.http import http_date, parse_date, parse_etags, parse_range_header
+
+from archive_store import ARCHIVE_TTL, DOWNLOAD_NAME, archive_etag, archive_path, remaining_ttl, start_sweeper, store_archive
+from admission import MAX_CONCURRENT_JOBS, AdmissionRejected, AsyncJobGate, check_upload_size, run_with_budget
+from profiling import ProfileNotAllowed, generate_profiled, requested_profile_mode
+from roster_share import SHARED_ROSTER_SUPPORTED, pack_roster
+from app import UPLOAD_FOLDER, FormJobError, generate_forms, load_roster, page_context, preview_forms, saved_headers
+
+# Number of PDF generations that can run at once (one process each)
+GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", MAX_CONCURRENT_JOBS))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+templates = Jinja2Templates(directory="templates")
+executor = None
+job_gate = AsyncJobGate(max_active=GENERATION_WORKERS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global executor
+    executor = ProcessPoolExecutor(max_workers=GENERATION_WORKERS)
+    start_sweeper()
+    try:
+        yield
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def rejection_response(e, background=None):
+    headers = {"Retry-After": "10"} if e.status == 429 else None
+    return PlainTextResponse(str(e), e.status, headers=headers, background=background)
+
+
+async def index(request):
+    if request.method == "GET":
+        return templates.TemplateResponse(request, "index.html", page_context())
+
+    # 1. Refuse oversized uploads before reading a byte of them
+    content_length = request.headers.get("content-length")
+    if content_length is None or not content_length.isdigit():
+        return PlainTextResponse("Content-Length required", 411)
+    try:
+        check_upload_size(int(content_length))
+    except AdmissionRejected as e:
+        return rejection_response(e)
+
+    # Receive the upload (python-multipart spools it to a temp file as it arrives)
+    form = await request.form()
+    upload = form.get("csv_file")
+    form_type = form.get("form_type")
+    output_format = form.get("output_format") or "pdf"
+
+    if upload is None or isinstance(upload, str):
+        return PlainTextResponse("No file uploaded", 400)
+    if not upload.filename or not form_type:
+        return PlainTextResponse("Missing file or selection", 400)
+
+    try:
+        profile_mode = requested_profile_mode(request.headers, request.query_params)
+    except ProfileNotAllowed as e:
+        return PlainTextResponse(str(e), 403)
+
+    # 2. Each request gets its own work folder so concurrent jobs can't collide
+    work_folder = tempfile.mkdtemp(dir=UPLOAD_FOLDER)
+    cleanup = BackgroundTask(shutil.rmtree, work_folder, ignore_errors=True)
+
+    # Responses below remove the folder once sent; anything else raised on the
+    # way (a broken pool, a full disk, a cancelled request) removes it here
+    try:
+        roster_path = os.path.join(work_folder, "roster")
+        with open(roster_path, "wb") as out:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                out.write(chunk)
+        await upload.close()
+
+        # 3. Read and check the roster first: a roster over the limits is refused
+        # now rather than after queueing for a slot
+        try:
+            df, _ = await run_in_threadpool(load_roster, roster_path, form_type)
+        except AdmissionRejected as e:
+            return rejection_response(e, background=cleanup)
+        except FormJobError as e:
+            return PlainTextResponse(str(e), e.status, background=cleanup)
+
+        # 4. Wait for a free slot, then generate in the process pool, off the event
+        # loop. The worker reads the roster from shared memory, not a pickle.
+        packed = await run_in_threadpool(pack_roster, df) if SHARED_ROSTER_SUPPORTED else None
+        job = (generate_forms, packed.handle if packed else df, form_type, work_folder, output_format)
+        if profile_mode:
+            job = (generate_profiled, profile_mode, work_folder) + job
+        loop = asyncio.get_running_loop()
+        try:
+            async with job_gate:
+                generated = await loop.run_in_executor(executor, run_with_budget, *job)
+        except AdmissionRejected as e:
+            return rejection_response(e, background=cleanup)
+        except FormJobError as e:
+            return PlainTextResponse(str(e), e.status, background=cleanup)
+        finally:
+            if packed is not None:
+                packed.close()
+
+        # 5. Keep the ZIP for a while under an unguessable ID, so a dropped download can resume
+        archive_id = await run_in_threadpool(store_archive, generated.zip_path)
+        download_url = request.url_for("download", archive_id=archive_id).path
+
+        if "application/json" in request.headers.get("accept", ""):
+            return JSONResponse({"download_url": download_url, "expires_in": ARCHIVE_TTL,
+                                 "pages_saved": generated.pages_saved, "bytes_saved": generated.bytes_saved},
+                                201, background=cleanup)
+
+        response = send_archive(request, archive_id)
+        response.headers["Content-Location"] = download_url
+        response.headers.update(saved_headers(generated))
+        response.background = cleanup
+        return response
+    except BaseException:
+        shutil.rmtree(work_folder, ignore_errors=True)
+        raise
+
+
+def _file_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(UPLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def send_archive(request, archive_id):
+    """Same conditional / Range handling as werkzeug's send_file on the Flask side."""
+    path = archive_path(archive_id)
+    if path is None:
+        return PlainTextResponse("Download expired or not found. Please generate the forms again.", 404)
+
+    stat = os.stat(path)
+    etag = archive_etag(archive_id)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": f"private, max-age={remaining_ttl(path)}",
+        "Accept-Ranges": "bytes",
+    }
+
+    # 1. Conditional GET: the client already has this exact archive
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = parse_date(request.headers.get("if-modified-since"))
+    if if_none_match is not None:
+        not_modified = parse_etags(if_none_match).contains_weak(etag)
+    else:
+        not_modified = if_modified_since is not None and int(stat.st_mtime) <= if_modified_since.timestamp()
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    # 2. Range: only honoured for a single range, and only if If-Range still matches
+    ranges = parse_range_header(request.headers.get("range"))
+    if_range = request.headers.get("if-range")
+    if ranges is not None and len(ranges.ranges) == 1 and (if_range is None or if_range == headers["ETag"]):
+        span = ranges.range_for_length(stat.st_size)
+        if span is None:
+            headers["Content-Range"] = f"bytes */{stat.st_size}"
+            return Response(status_code=416, headers=headers)
+        start, stop = span
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{stat.st_size}"
+        headers["Content-Length"] = str(stop - start)
+        headers["Content-Disposition"] = f'attachment; filename="{DOWNLOAD_NAME}"'
+        return StreamingResponse(_file_range(path, start, stop - start), 206,
+                                 headers=headers, media_type="application/zip")
+
+    return FileResponse(path, filename=DOWNLOAD_NAME, headers=headers, media_type="application/zip", stat_result=stat)
+
+
+async def download(request):
+    return send_archive(request, request.path_params["archive_id"])
+
+
+async def preview(request):
+    content_length = request.headers.get("content-length")
+    if content_length is None or not content_length.isdigit():
+        return PlainTextResponse("Content-Length required", 411)
+    try:
+        check_upload_size(int(content_length))
+    except AdmissionRejected as e:
+        return rejection_response(e)
+
+    form = await request.form()
+    upload = form.get("csv_file")
+    form_type = form.get("form_type")
+
+    if upload is None or isinstance(upload, str):
+        return PlainTextResponse("No file uploaded", 400)
+    if not upload.filename or not form_type:
+        return PlainTextResponse("Missing file or selection", 400)
+
+    # Mapping only (no PDF work): a thread is enough, no process pool slot needed
+    roster_bytes = await upload.read()
+    await upload.close()
+    try:
+        result = await run_in_threadpool(preview_forms, io.BytesIO(roster_bytes), form_type)
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    except FormJobError as e:
+        return PlainTextResponse(str(e), e.status)
+    return JSONResponse(result)
+
+
+app = Starlette(
+    routes=[
+        Route("/", index, methods=["GET", "POST"]),
+        Route("/preview", preview, methods=["POST"]),
+        Route("/download/{archive_id}", download, methods=["GET"], name="download"),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,87 @@
+"""Micro-benchmark: per-call pd.to_datetime vs dob_parser.parse_dob.
+
+Run from the project root:  python benchmarks/bench_dob_parse.py
+"""
+import os
+import random
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dob_parser import clear_cache, parse_dob  # noqa: E402
+
+ROSTER_SIZE = 2000
+REPEATS = 5
+
+
+def make_roster(n, seed=0):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(n):
+        y, m, d = rng.randint(1960, 2015), rng.randint(1, 12), rng.randint(1, 28)
+        style = rng.random()
+        if style < 0.6:
+            values.append(f"{d:02d}/{m:02d}/{y}")
+        elif style < 0.95:
+            values.append(f"{y}-{m:02d}-{d:02d}")
+        else:
+            values.append(f"{d:02d}/{m:02d}/{str(y)[-2:]}")  # slow-path input
+    return values
+
+
+def old_parse(raw_dob):
+    dd, mm, yy = "", "", ""
+    if pd.notna(raw_dob):
+        try:
+            dt = pd.to_datetime(raw_dob, dayfirst=True)
+            dd, mm, yy = str(dt.day).zfill(2), str(dt.month).zfill(2), str(dt.year)
+        except Exception:
+            pass
+    return dd, mm, yy
+
+
+def new_parse(raw_dob):
+    dt = parse_dob(raw_dob)
+    if dt is None:
+        return "", "", ""
+    return str(dt.day).zfill(2), str(dt.month).zfill(2), str(dt.year)
+
+
+def best_of(func, values, cold=False):
+    best = float("inf")
+    for _ in range(REPEATS):
+        if cold:
+            clear_cache()
+        start = time.perf_counter()
+        for v in values:
+            func(v)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    warnings.simplefilter("ignore")
+    values = make_roster(ROSTER_SIZE)
+
+    # pd.to_datetime(dayfirst=True) reads an ambiguous 1995-01-03 as 1 March, so
+    # ISO values are expected to differ; everything else must match exactly.
+    mismatches = [v for v in values if "-" not in v and old_parse(v) != new_parse(v)]
+    if mismatches:
+        print(f"WARNING: {len(mismatches)} values parse differently, e.g. {mismatches[:3]}")
+
+    t_old = best_of(old_parse, values)
+    t_cold = best_of(new_parse, values, cold=True)
+    t_warm = best_of(new_parse, values)
+
+    print(f"{ROSTER_SIZE} DOB values, best of {REPEATS}")
+    for label, t in (("pd.to_datetime per call", t_old),
+                     ("parse_dob (cold cache)", t_cold),
+                     ("parse_dob (warm cache)", t_warm)):
+        print(f"  {label:<26}{t * 1000:9.2f} ms  {t / ROSTER_SIZE * 1e6:8.2f} us/value  x{t_old / t:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Full rewrite vs incremental update, for every template in FORM_CONFIG.
+
+Runs each processor on the same roster in both PDF_OUTPUT_MODEs and reports
+wall time per batch and bytes written.
+
+Run from the project root:  python benchmarks/bench_incremental_writer.py [--rows 26]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+from common import ROOT, make_roster
+
+import form_logic  # noqa: E402
+from app import FORM_CONFIG, TEMPLATE_FOLDER  # noqa: E402
+from incremental_writer import load_template  # noqa: E402
+
+
+def run(form_type, roster, mode):
+    config = FORM_CONFIG[form_type]
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"])
+    out_folder = tempfile.mkdtemp()
+    form_logic.PDF_OUTPUT_MODE = mode
+    try:
+        start = time.perf_counter()
+        outputs = config["func"](roster, template_path, out_folder)
+        elapsed = time.perf_counter() - start
+        template_size = os.path.getsize(template_path)
+        written = sum(os.path.getsize(p) for p in outputs)
+        return elapsed, len(outputs), written, written - template_size * len(outputs)
+    finally:
+        shutil.rmtree(out_folder)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=26)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    roster = make_roster(args.rows)
+
+    print(f"{args.rows} candidates per form\n")
+    print(f"{'form':<24}{'batches':>8}{'full ms/batch':>15}{'incr ms/batch':>15}{'speedup':>9}"
+          f"{'full KB':>10}{'incr KB':>10}{'new KB/batch':>14}")
+    for form_type, config in FORM_CONFIG.items():
+        # Parse/index the template once up front, as a long-running worker would have
+        load_template(os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"]))
+        full_t, batches, full_bytes, _ = run(form_type, roster, "full")
+        incr_t, _, incr_bytes, appended = run(form_type, roster, "incremental")
+        print(f"{form_type:<24}{batches:>8}{full_t / batches * 1000:>15.1f}{incr_t / batches * 1000:>15.1f}"
+              f"{full_t / incr_t:>8.1f}x{full_bytes / 1024:>10.0f}{incr_bytes / 1024:>10.0f}"
+              f"{appended / batches / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Output size and write time with and without PDF_STRIP_UNUSED, for every template.
+
+Runs each processor on the same roster in every output configuration (full
+rewrite with each PDF_BACKEND, incremental), once filling the original
+templates and once filling the lean copies (lean_templates.py). Lean copies
+are built before timing, as a running server would already have them.
+
+Run from the project root:  python benchmarks/bench_lean_templates.py [--rows 26]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+from common import ROOT, make_roster
+
+import form_logic  # noqa: E402
+import lean_templates  # noqa: E402
+import pdf_backends  # noqa: E402
+from app import FORM_CONFIG, TEMPLATE_FOLDER  # noqa: E402
+
+CONFIGS = [("full", "pypdf"), ("full", "pikepdf"), ("incremental", "pypdf")]
+
+
+def run(form_type, roster, strip):
+    config = FORM_CONFIG[form_type]
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"])
+    form_logic.PDF_STRIP_UNUSED = strip
+    out_folder = tempfile.mkdtemp()
+    try:
+        config["func"](roster, template_path, out_folder)  # warm the template caches and lean copies
+        shutil.rmtree(out_folder)
+        os.makedirs(out_folder)
+        start = time.perf_counter()
+        outputs = config["func"](roster, template_path, out_folder)
+        elapsed = time.perf_counter() - start
+        return elapsed / len(outputs), sum(os.path.getsize(p) for p in outputs) / len(outputs)
+    finally:
+        shutil.rmtree(out_folder)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=26)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    roster = make_roster(args.rows)
+    lean_templates.LEAN_TEMPLATE_FOLDER = tempfile.mkdtemp()
+
+    try:
+        for mode, backend in CONFIGS:
+            if backend == "pikepdf" and lean_templates.pikepdf is None:
+                continue
+            form_logic.PDF_OUTPUT_MODE, pdf_backends.PDF_BACKEND = mode, backend
+            print(f"\n== {mode} / {backend}, {args.rows} candidates ==")
+            print(f"{'form':<24}{'ms/batch':>10}{'stripped':>10}{'KB/batch':>10}{'stripped':>10}{'saved':>8}")
+            for form_type in FORM_CONFIG:
+                plain_t, plain_size = run(form_type, roster, False)
+                lean_t, lean_size = run(form_type, roster, True)
+                print(f"{form_type:<24}{plain_t * 1000:>10.0f}{lean_t * 1000:>10.0f}{plain_size / 1024:>10.0f}"
+                      f"{lean_size / 1024:>10.0f}{1 - lean_size / plain_size:>8.0%}")
+    finally:
+        shutil.rmtree(lean_templates.LEAN_TEMPLATE_FOLDER)
+
+
+if __name__ == "__main__":
+    main()
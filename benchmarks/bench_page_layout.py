@@ -0,0 +1,77 @@
+"""Pages and bytes the page planner saves, for every template and a few roster sizes.
+
+Runs each processor twice on the same roster: once as planned (pages without a
+filled slot left out, see form_logic.unused_pages) and once emitting every
+template page, as the processors did before. Prints the pages emitted, the
+total output size of both runs and what bytes_saved reports for the request.
+
+Runs the default output (full rewrite through pypdf); pick another with
+--mode/--backend, and --strip for PDF_STRIP_UNUSED.
+
+Run from the project root:  python benchmarks/bench_page_layout.py [--rows 4,17,30]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import warnings
+
+from common import ROOT, make_roster
+
+import form_logic  # noqa: E402
+import lean_templates  # noqa: E402
+import pdf_backends  # noqa: E402
+from app import FORM_CONFIG, TEMPLATE_FOLDER  # noqa: E402
+from incremental_writer import load_template  # noqa: E402
+
+planned_pages = form_logic.unused_pages
+
+
+def every_page(page_slots, slots):
+    return ()
+
+
+def run(form_type, roster, trim):
+    config = FORM_CONFIG[form_type]
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"])
+    form_logic.unused_pages = planned_pages if trim else every_page
+    out_folder = tempfile.mkdtemp()
+    try:
+        batches = config["plan"](roster)
+        outputs = form_logic.render_batches(batches, template_path, out_folder)
+        page_count = len(load_template(template_path).widgets) * len(batches) - form_logic.pages_saved(batches)
+        return page_count, sum(os.path.getsize(p) for p in outputs), form_logic.bytes_saved(batches, template_path)
+    finally:
+        form_logic.unused_pages = planned_pages
+        shutil.rmtree(out_folder)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="4,17,30", help="comma-separated roster sizes")
+    parser.add_argument("--mode", default="full", choices=["full", "incremental"])
+    parser.add_argument("--backend", default="pypdf", choices=list(pdf_backends.BACKENDS))
+    parser.add_argument("--strip", action="store_true", help="fill lean copies (PDF_STRIP_UNUSED)")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    form_logic.PDF_OUTPUT_MODE, pdf_backends.PDF_BACKEND = args.mode, args.backend
+    form_logic.PDF_STRIP_UNUSED = args.strip
+    lean_templates.LEAN_TEMPLATE_FOLDER = tempfile.mkdtemp()
+
+    try:
+        for rows in [int(r) for r in args.rows.split(",")]:
+            roster = make_roster(rows)
+            print(f"\n== {rows} candidates, {args.mode} / {args.backend}"
+                  f"{' / PDF_STRIP_UNUSED' if args.strip else ''} ==")
+            print(f"{'form':<24}{'pages':>7}{'planned':>9}{'KB':>8}{'planned':>9}{'saved':>8}{'reported KB':>13}")
+            for form_type in FORM_CONFIG:
+                all_pages, all_size, _ = run(form_type, roster, False)
+                pages, size, reported = run(form_type, roster, True)
+                print(f"{form_type:<24}{all_pages:>7}{pages:>9}{all_size / 1024:>8.0f}{size / 1024:>9.0f}"
+                      f"{1 - size / all_size:>8.0%}{reported / 1024:>13.0f}")
+    finally:
+        shutil.rmtree(lean_templates.LEAN_TEMPLATE_FOLDER)
+
+
+if __name__ == "__main__":
+    main()
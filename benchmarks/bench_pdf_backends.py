@@ -0,0 +1,64 @@
+"""pypdf vs pikepdf full-rewrite backends, for every template in FORM_CONFIG.
+
+Runs each processor on the same roster with each PDF_BACKEND (full output
+mode) and reports wall time per batch and bytes written.
+
+Run from the project root:  python benchmarks/bench_pdf_backends.py [--rows 26]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+from common import ROOT, make_roster
+
+import form_logic  # noqa: E402
+import pdf_backends  # noqa: E402
+from app import FORM_CONFIG, TEMPLATE_FOLDER  # noqa: E402
+from incremental_writer import load_template  # noqa: E402
+
+
+def run(form_type, roster, backend):
+    config = FORM_CONFIG[form_type]
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"])
+    out_folder = tempfile.mkdtemp()
+    pdf_backends.PDF_BACKEND = backend
+    try:
+        start = time.perf_counter()
+        outputs = config["func"](roster, template_path, out_folder)
+        elapsed = time.perf_counter() - start
+        return elapsed, len(outputs), sum(os.path.getsize(p) for p in outputs)
+    finally:
+        shutil.rmtree(out_folder)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=26)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    roster = make_roster(args.rows)
+    form_logic.PDF_OUTPUT_MODE = "full"
+    pdf_backends.get_backend("pikepdf")  # fail early if pikepdf isn't installed
+
+    print(f"{args.rows} candidates per form\n")
+    print(f"{'form':<24}{'batches':>8}{'pypdf ms/batch':>16}{'pikepdf ms/batch':>18}{'speedup':>9}"
+          f"{'pypdf KB':>10}{'pikepdf KB':>12}")
+    totals = {"pypdf": 0.0, "pikepdf": 0.0}
+    for form_type, config in FORM_CONFIG.items():
+        # Parse/index the template once up front, as a long-running worker would have
+        load_template(os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"]))
+        pypdf_t, batches, pypdf_bytes = run(form_type, roster, "pypdf")
+        pikepdf_t, _, pikepdf_bytes = run(form_type, roster, "pikepdf")
+        totals["pypdf"] += pypdf_t
+        totals["pikepdf"] += pikepdf_t
+        print(f"{form_type:<24}{batches:>8}{pypdf_t / batches * 1000:>16.1f}{pikepdf_t / batches * 1000:>18.1f}"
+              f"{pypdf_t / pikepdf_t:>8.1f}x{pypdf_bytes / 1024:>10.0f}{pikepdf_bytes / 1024:>12.0f}")
+    print(f"\n{'all forms':<24}{'':>8}{totals['pypdf']:>15.2f}s{totals['pikepdf']:>17.2f}s"
+          f"{totals['pypdf'] / totals['pikepdf']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-worker memory and first-request latency with and without PRELOAD_TEMPLATES.
+
+Starts `gunicorn app:app` twice (PRELOAD_TEMPLATES=0, then 1). Each time it
+records how long the first request for each form type takes, then warms
+every worker on every template and reports per-worker RSS and PSS. PSS splits
+shared pages between the processes that map them, so the PSS total is the
+real footprint.
+
+Run from the project root (Linux only, reads /proc):
+    python benchmarks/bench_prefork.py --workers 4
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from common import ROOT, make_roster_csv
+from load_slow_clients import BOUNDARY, make_multipart, wait_for_port
+
+from app import FORM_CONFIG  # noqa: E402
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def post(port, body):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/", data=body, method="POST",
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=600) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+
+def run(preload, args, port):
+    env = dict(os.environ, PRELOAD_TEMPLATES="1" if preload else "0", PDF_OUTPUT_MODE=args.output_mode)
+    cmd = [sys.executable, "-m", "gunicorn", "app:app", "-w", str(args.workers),
+           "-b", f"127.0.0.1:{port}", "--timeout", "300", "--log-level", "warning"]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    try:
+        wait_for_port(port, timeout=120)
+        # With preloading the master binds first and forks only after parsing
+        while len(worker_pids(proc.pid)) < args.workers:
+            time.sleep(0.1)
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=60).read()
+        startup = time.perf_counter() - start
+        time.sleep(1)  # let every worker finish booting
+        idle = {pid: memory_kb(pid) for pid in worker_pids(proc.pid)}
+
+        bodies = {form: make_multipart(make_roster_csv(args.rows), form) for form in FORM_CONFIG}
+        first = {form: post(port, body) for form, body in bodies.items()}
+        for _ in range(args.workers * 3):  # spread every template over every worker
+            for body in bodies.values():
+                post(port, body)
+        warm = {pid: memory_kb(pid) for pid in worker_pids(proc.pid)}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    label = "PRELOAD_TEMPLATES=1" if preload else "PRELOAD_TEMPLATES=0"
+    print(f"\n== {label} ({args.workers} workers, {args.output_mode} output) ==")
+    print(f"  ready after {startup:.2f}s")
+    print("  first request per form:")
+    for form, seconds in first.items():
+        print(f"    {form:<24}{seconds * 1000:8.0f} ms")
+    print(f"    {'mean':<24}{sum(first.values()) / len(first) * 1000:8.0f} ms")
+    print("  worker memory (MB)        RSS idle  RSS warm  PSS warm")
+    for pid in warm:
+        print(f"    pid {pid:<20}{idle.get(pid, {}).get('Rss', 0) / 1024:8.1f}"
+              f"{warm[pid]['Rss'] / 1024:10.1f}{warm[pid]['Pss'] / 1024:10.1f}")
+    print(f"    {'total PSS':<24}{'':18}{sum(m['Pss'] for m in warm.values()) / 1024:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=13)
+    parser.add_argument("--output-mode", choices=["full", "incremental"], default="full")
+    parser.add_argument("--port", type=int, default=8775)
+    args = parser.parse_args()
+    run(False, args, args.port)
+    run(True, args, args.port + 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Per-batch cost of handing roster rows to a worker process.
+
+Compares, per batch of --batch-size rows:
+
+    pickle slice   pickle.dumps(df.iloc[start:stop]) in the parent, loads in the worker
+    shared arrow   the roster packed once into shared memory (roster_share.py);
+                   the task carries the handle and the worker reads its row range
+                   (attaching on its first batch, then reusing the mapping)
+    pickle plan    what render_batches actually needs: the batch dict from the
+                   form's plan (field values only)
+
+"in-process" times serialize + deserialize without a pool, so it is the pure
+handoff cost. "pool" runs every batch through a ProcessPoolExecutor whose task
+only rebuilds the rows, so it includes the IPC round trip as well.
+
+Run from the project root:  python benchmarks/bench_roster_handoff.py [--rows 500,5000]
+"""
+import argparse
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common import make_roster
+
+import roster_share  # noqa: E402
+from form_logic import plan_efa  # noqa: E402
+
+REPEATS = 3
+
+
+# --- WORKER TASKS ---
+def load_pickled(payload):
+    return len(pickle.loads(payload))
+
+
+def load_shared(handle, start, stop):
+    return len(roster_share.attach_roster(handle).rows(start, stop))
+
+
+# --- MEASUREMENT ---
+def best_of(func):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def in_process(df, ranges, packed, plans):
+    def pickled():
+        for start, stop in ranges:
+            pickle.loads(pickle.dumps(df.iloc[start:stop]))
+
+    def shared():
+        roster_share.detach_all()  # count the first attach, as a fresh worker would
+        for start, stop in ranges:
+            handle = pickle.loads(pickle.dumps(packed.handle))
+            roster_share.attach_roster(handle).rows(start, stop)
+
+    def planned():
+        for batch in plans:
+            pickle.loads(pickle.dumps(batch))
+
+    return {"pickle slice": best_of(pickled), "shared arrow": best_of(shared), "pickle plan": best_of(planned)}
+
+
+def through_pool(df, ranges, packed, workers):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(load_pickled, [pickle.dumps(df.iloc[:1])] * workers))  # start the workers
+
+        def pickled():
+            list(pool.map(load_pickled, [pickle.dumps(df.iloc[start:stop]) for start, stop in ranges]))
+
+        def shared():
+            list(pool.map(load_shared, *zip(*[(packed.handle, start, stop) for start, stop in ranges])))
+
+        return {"pickle slice": best_of(pickled), "shared arrow": best_of(shared)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="500,5000", help="comma-separated roster sizes")
+    parser.add_argument("--batch-size", type=int, default=10, help="rows per batch (EFA sheets hold 10)")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    for rows in [int(r) for r in args.rows.split(",")]:
+        df = make_roster(rows)
+        ranges = [(start, min(start + args.batch_size, rows)) for start in range(0, rows, args.batch_size)]
+        plans = plan_efa(df)
+        slice_bytes = sum(len(pickle.dumps(df.iloc[a:b])) for a, b in ranges) / len(ranges)
+        plan_bytes = sum(len(pickle.dumps(batch)) for batch in plans) / len(plans)
+
+        pack_time = time.perf_counter()
+        with roster_share.pack_roster(df) as packed:
+            pack_time = time.perf_counter() - pack_time
+            handle_bytes = len(pickle.dumps(packed.handle))
+            local = in_process(df, ranges, packed, plans)
+            pooled = through_pool(df, ranges, packed, args.workers)
+            roster_share.detach_all()
+
+        print(f"\n== {rows} rows, {len(ranges)} batches of {args.batch_size} ==")
+        print(f"packed once: {packed.handle.size / 1024:.0f} KB shared block in {pack_time * 1000:.1f} ms")
+        print(f"{'handoff':<14}{'bytes/batch':>12}{'in-process us/batch':>21}{'pool us/batch':>15}")
+        sizes = {"pickle slice": slice_bytes, "shared arrow": handle_bytes, "pickle plan": plan_bytes}
+        for name, size in sizes.items():
+            per_batch = local[name] / len(ranges) * 1e6
+            pool = f"{pooled[name] / len(ranges) * 1e6:>15.0f}" if name in pooled else f"{'-':>15}"
+            print(f"{name:<14}{size:>12.0f}{per_batch:>21.0f}{pool}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Roster ingestion: full pd.read_csv(dtype=str) vs roster_io.read_roster.
+
+Builds a wide export (the roster columns plus --extra-columns filler columns,
+like a registration system dump) and reports rows/s for the old full read and
+for read_roster on CSV, gzipped CSV, XLSX and Parquet. "compact csv.gz" is
+what the upload page sends for a CSV: only the roster columns, gzipped.
+
+Run from the project root:  python benchmarks/bench_roster_ingest.py [--rows 5000]
+"""
+import argparse
+import gzip
+import io
+import time
+
+import pandas as pd
+
+from common import make_roster
+
+import roster_io  # noqa: E402
+
+REPEATS = 3
+
+
+def make_export(rows, extra_columns):
+    df = make_roster(rows)
+    df["Province"] = "ON"
+    for c in range(extra_columns):
+        df[f"Extra{c}"] = [f"value {c}-{i}" for i in range(rows)]
+    return df
+
+
+def best_of(func, data):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        df = func(io.BytesIO(data))
+        times.append(time.perf_counter() - start)
+    return min(times), df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--extra-columns", type=int, default=40)
+    args = parser.parse_args()
+
+    export = make_export(args.rows, args.extra_columns)
+    csv_bytes = export.to_csv(index=False).encode()
+    compact = export[[c for c in export.columns if c in roster_io.ROSTER_COLUMNS]].to_csv(index=False).encode()
+    payloads = {"csv": csv_bytes, "csv.gz": gzip.compress(csv_bytes), "compact csv.gz": gzip.compress(compact)}
+    try:
+        buf = io.BytesIO()
+        export.to_excel(buf, index=False)
+        payloads["xlsx"] = buf.getvalue()
+    except ImportError:
+        print("openpyxl not installed, skipping XLSX")
+    try:
+        buf = io.BytesIO()
+        export.to_parquet(buf, index=False)
+        payloads["parquet"] = buf.getvalue()
+    except ImportError:
+        print("pyarrow not installed, skipping Parquet")
+
+    print(f"{args.rows} rows x {len(export.columns)} columns, CSV engine: {roster_io.CSV_ENGINE}\n")
+    print(f"{'reader':<36}{'upload KB':>10}{'ms':>9}{'rows/s':>12}{'speedup':>9}")
+    baseline, _ = best_of(lambda f: pd.read_csv(f, dtype=str).fillna(""), csv_bytes)
+    print(f"{'pd.read_csv(dtype=str)  [csv]':<36}{len(csv_bytes) / 1024:>10.0f}{baseline * 1000:>9.1f}"
+          f"{args.rows / baseline:>12.0f}{'1.0x':>9}")
+    for fmt, data in payloads.items():
+        elapsed, df = best_of(roster_io.read_roster, data)
+        assert len(df) == args.rows and set(df.columns) <= set(roster_io.ROSTER_COLUMNS)
+        print(f"{'read_roster  [' + fmt + ']':<36}{len(data) / 1024:>10.0f}{elapsed * 1000:>9.1f}"
+              f"{args.rows / elapsed:>12.0f}{baseline / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+ROSTER_COLUMNS = ["AttendeeName", "Street", "City", "PostalCode", "E-mail", "AttendeePhone", "DateOfBirth"]
+
+
+def make_roster(rows):
+    """A synthetic roster DataFrame shaped like a registration export."""
+    data = [{
+        "AttendeeName": f"Candidate{i} , Test",
+        "Street": f"{i} Main St",
+        "City": "Markham",
+        "PostalCode": "L3P 3M2",
+        "E-mail": f"c{i}@example.com",
+        "AttendeePhone": f"905-555-{i:04d}",
+        "DateOfBirth": f"{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/{1990 + i % 20}",
+    } for i in range(rows)]
+    return pd.DataFrame(data, columns=ROSTER_COLUMNS, dtype=str)
+
+
+def make_roster_csv(rows):
+    return make_roster(rows).to_csv(index=False).encode()
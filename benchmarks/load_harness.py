@@ -0,0 +1,270 @@
+"""Concurrent-load harness: how many simultaneous uploads one instance takes.
+
+Starts the app on localhost once per worker configuration, then fires a
+seeded random mix of form types and roster sizes at POST / from --concurrency
+parallel clients. For each configuration it reports latency percentiles,
+throughput, the error rate by status and the peak resident memory of the
+server's process tree (master plus workers, sampled from /proc).
+
+Results are written as JSON (benchmarks/results/ by default) and can be
+compared with an earlier run, e.g. the previous release:
+
+    python benchmarks/load_harness.py --server gunicorn --workers 1,2,4 \\
+        --concurrency 8 --requests 64 --mix efa:3,bronze_med:1 --rows 10,40
+    python benchmarks/load_harness.py ... --compare benchmarks/results/load_<old>.json
+
+Admission limits apply as usual (429s count as errors); pass --env
+MAX_QUEUED_JOBS=100 and similar to load-test past them. Linux only (reads /proc).
+"""
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from common import ROOT, make_roster_csv
+from load_slow_clients import BOUNDARY, make_multipart, wait_for_port
+
+RESULTS_FOLDER = os.path.join(ROOT, "benchmarks", "results")
+MEMORY_SAMPLE_INTERVAL = 0.1
+
+
+# --- SERVER ---
+def start_server(kind, workers, port, env_overrides):
+    env = dict(os.environ, **env_overrides)
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "app:app", "-w", str(workers),
+               "-b", f"127.0.0.1:{port}", "--timeout", "300", "--log-level", "warning"]
+    elif kind == "uvicorn":
+        env["GENERATION_WORKERS"] = str(workers)
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--log-level", "warning"]
+    else:  # Flask's threaded development server; workers has no meaning here
+        cmd = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port), "--with-threads"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port, timeout=120)
+    return proc
+
+
+def process_tree(pid):
+    pids, queue = [], [pid]
+    while queue:
+        current = queue.pop()
+        pids.append(current)
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                queue.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            pass
+    return pids
+
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+class MemorySampler(threading.Thread):
+    """Tracks the peak total RSS of a process tree, and of its largest process."""
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.stop = threading.Event()
+        self.peak_total = 0
+        self.peak_process = 0
+
+    def run(self):
+        while not self.stop.wait(MEMORY_SAMPLE_INTERVAL):
+            sizes = [rss_kb(pid) for pid in process_tree(self.pid)]
+            self.peak_total = max(self.peak_total, sum(sizes))
+            self.peak_process = max(self.peak_process, max(sizes, default=0))
+
+
+# --- CLIENTS ---
+def post(port, body):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/", data=body, method="POST",
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=600) as resp:
+            resp.read()
+            status = str(resp.status)
+    except urllib.error.HTTPError as e:
+        status = str(e.code)
+    except OSError as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100))  # ceil without floats
+    return values[int(rank) - 1]
+
+
+def latency_summary(seconds):
+    ms = sorted(s * 1000 for s in seconds)
+    if not ms:
+        return {}
+    return {
+        "p50": percentile(ms, 50), "p95": percentile(ms, 95), "p99": percentile(ms, 99),
+        "mean": sum(ms) / len(ms), "max": ms[-1],
+    }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        form, _, weight = part.partition(":")
+        mix[form.strip()] = float(weight or 1)
+    return mix
+
+
+def run_config(kind, workers, args, port):
+    rng = random.Random(args.seed)
+    forms, weights = zip(*parse_mix(args.mix).items())
+    plan = [(rng.choices(forms, weights)[0], rng.choice(args.rows)) for _ in range(args.requests)]
+    bodies = {key: make_multipart(make_roster_csv(key[1]), key[0]) for key in set(plan)}
+
+    proc = start_server(kind, workers, port, args.env)
+    sampler = MemorySampler(proc.pid)
+    try:
+        # Warm up every form once so template parsing isn't counted as load
+        for form in forms:
+            post(port, make_multipart(make_roster_csv(1), form))
+
+        sampler.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda key: (key, *post(port, bodies[key])), plan))
+        wall = time.perf_counter() - start
+    finally:
+        sampler.stop.set()
+        sampler.join()
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    ok = [seconds for _, status, seconds in results if status == "200"]
+    statuses = collections.Counter(status for _, status, _ in results)
+    per_form = collections.defaultdict(list)
+    for (form, _), status, seconds in results:
+        if status == "200":
+            per_form[form].append(seconds)
+
+    return {
+        "server": kind,
+        "workers": workers,
+        "requests": len(results),
+        "ok": len(ok),
+        "statuses": dict(statuses),
+        "error_rate": 1 - len(ok) / len(results),
+        "wall_seconds": wall,
+        "throughput_rps": len(ok) / wall,
+        "candidates_per_second": sum(rows for (_, rows), status, _ in results if status == "200") / wall,
+        "latency_ms": latency_summary(ok),
+        "per_form_latency_ms": {form: latency_summary(s) for form, s in sorted(per_form.items())},
+        "peak_rss_mb": {"total": sampler.peak_total / 1024, "largest_process": sampler.peak_process / 1024},
+    }
+
+
+# --- REPORTING ---
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(run):
+    lat = run["latency_ms"]
+    print(f"\n== {run['server']}, {run['workers']} worker(s) ==")
+    print(f"  requests     : {run['ok']}/{run['requests']} ok, error rate {run['error_rate']:.1%}, statuses {run['statuses']}")
+    print(f"  throughput   : {run['throughput_rps']:.2f} req/s, {run['candidates_per_second']:.1f} candidates/s")
+    if lat:
+        print(f"  latency (ms) : p50 {lat['p50']:.0f}  p95 {lat['p95']:.0f}  p99 {lat['p99']:.0f}  max {lat['max']:.0f}")
+    print(f"  peak RSS (MB): total {run['peak_rss_mb']['total']:.0f}, largest process {run['peak_rss_mb']['largest_process']:.0f}")
+
+
+def print_comparison(runs, previous):
+    old_runs = {(r["server"], r["workers"]): r for r in previous["runs"]}
+    print(f"\n== compared with {previous.get('commit') or '?'} ({previous.get('started', '?')}) ==")
+    print(f"  {'config':<18}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}{'peak MB':>10}")
+    for run in runs:
+        old = old_runs.get((run["server"], run["workers"]))
+        if old is None or not old["latency_ms"] or not run["latency_ms"]:
+            continue
+
+        def change(new, before):
+            return f"{(new - before) / before:+.0%}" if before else "n/a"
+        print(f"  {run['server'] + ' x' + str(run['workers']):<18}"
+              + "".join(f"{change(run['latency_ms'][p], old['latency_ms'][p]):>10}" for p in ("p50", "p95", "p99"))
+              + f"{change(run['throughput_rps'], old['throughput_rps']):>10}"
+              + f"{change(run['peak_rss_mb']['total'], old['peak_rss_mb']['total']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["flask", "gunicorn", "uvicorn"], default="gunicorn")
+    parser.add_argument("--workers", default="1,2", help="comma-separated worker counts to test")
+    parser.add_argument("--concurrency", type=int, default=4, help="simultaneous clients")
+    parser.add_argument("--requests", type=int, default=32, help="requests per configuration")
+    parser.add_argument("--mix", default="efa:1,bronze_med:1,national_lifeguard:1",
+                        help="form types with relative weights, e.g. efa:3,bronze_star:1")
+    parser.add_argument("--rows", default="10,40", help="comma-separated roster sizes to draw from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the server (repeatable)")
+    parser.add_argument("--port", type=int, default=8785)
+    parser.add_argument("--out", help="results file (default: benchmarks/results/load_<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+    args.rows = [int(r) for r in args.rows.split(",")]
+    args.env = dict(item.split("=", 1) for item in args.env)
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    started = datetime.datetime.now().isoformat(timespec="seconds")
+    runs = []
+    for offset, workers in enumerate(worker_counts):
+        run = run_config(args.server, workers, args, args.port + offset)
+        print_run(run)
+        runs.append(run)
+
+    results = {
+        "started": started,
+        "commit": git_commit(),
+        "host": {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()},
+        "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "runs": runs,
+    }
+    out = args.out or os.path.join(RESULTS_FOLDER, f"load_{started.replace(':', '')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"\nresults written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(runs, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
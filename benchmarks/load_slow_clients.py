@@ -0,0 +1,152 @@
+"""Slow-client load test: sync gunicorn (app:app) vs the ASGI front (asgi:app).
+
+A handful of fake "pool-deck Wi-Fi" clients trickle their upload in and read
+the ZIP back slowly, while normal clients submit rosters at the same time. The
+script reports how long the normal clients had to wait on each server.
+
+Run from the project root:
+    python benchmarks/load_slow_clients.py --workers 2 --slow-clients 4
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from common import ROOT, make_roster_csv
+
+BOUNDARY = "----automator-load-test"
+
+
+def make_multipart(csv_bytes, form_type):
+    return b"".join([
+        f"--{BOUNDARY}\r\n".encode(),
+        b'Content-Disposition: form-data; name="form_type"\r\n\r\n',
+        form_type.encode(), b"\r\n",
+        f"--{BOUNDARY}\r\n".encode(),
+        b'Content-Disposition: form-data; name="csv_file"; filename="roster.csv"\r\n',
+        b"Content-Type: text/csv\r\n\r\n",
+        csv_bytes, b"\r\n",
+        f"--{BOUNDARY}--\r\n".encode(),
+    ])
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def start_server(kind, port, workers):
+    env = dict(os.environ, GENERATION_WORKERS=str(workers))
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "app:app", "-w", str(workers),
+               "-b", f"127.0.0.1:{port}", "--timeout", "300", "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    wait_for_port(port)
+    return proc
+
+
+def slow_client(port, body, trickle_seconds, results):
+    """Sends the body in small pieces over trickle_seconds, then reads the reply slowly."""
+    start = time.perf_counter()
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=600) as sock:
+            sock.sendall((
+                "POST / HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                f"Content-Type: multipart/form-data; boundary={BOUNDARY}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode())
+            pieces = 20
+            step = max(1, len(body) // pieces)
+            for offset in range(0, len(body), step):
+                sock.sendall(body[offset:offset + step])
+                time.sleep(trickle_seconds / pieces)
+            received = 0
+            while chunk := sock.recv(16 * 1024):
+                received += len(chunk)
+                time.sleep(0.01)
+        results.append(("ok" if received else "empty", time.perf_counter() - start))
+    except OSError as e:
+        results.append((f"error: {e}", time.perf_counter() - start))
+
+
+def fast_client(port, body, results):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/", data=body, method="POST",
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=600) as resp:
+            resp.read()
+            results.append((str(resp.status), time.perf_counter() - start))
+    except Exception as e:
+        results.append((f"error: {e}", time.perf_counter() - start))
+
+
+def run_scenario(kind, args, port):
+    body = make_multipart(make_roster_csv(args.rows), args.form_type)
+    proc = start_server(kind, port, args.workers)
+    try:
+        # Warm up (imports, first template read) so it doesn't skew the numbers
+        fast_client(port, body, [])
+
+        slow_results, fast_results = [], []
+        slow_threads = [threading.Thread(target=slow_client, args=(port, body, args.trickle_seconds, slow_results))
+                        for _ in range(args.slow_clients)]
+        for t in slow_threads:
+            t.start()
+        time.sleep(0.5)  # let the slow clients grab their connections first
+
+        fast_threads = [threading.Thread(target=fast_client, args=(port, body, fast_results))
+                        for _ in range(args.fast_clients)]
+        for t in fast_threads:
+            t.start()
+        for t in fast_threads + slow_threads:
+            t.join()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    fast_times = [t for status, t in fast_results if status == "200"]
+    print(f"\n== {kind} ({args.workers} workers) ==")
+    print(f"  slow clients : {len(slow_results)} done, statuses {sorted({s for s, _ in slow_results})}")
+    if fast_times:
+        print(f"  fast clients : {len(fast_times)}/{len(fast_results)} ok, "
+              f"median {statistics.median(fast_times):.2f}s, max {max(fast_times):.2f}s")
+    else:
+        print(f"  fast clients : none succeeded ({fast_results})")
+    return fast_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["gunicorn", "uvicorn", "both"], default="both")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--slow-clients", type=int, default=4)
+    parser.add_argument("--fast-clients", type=int, default=3)
+    parser.add_argument("--trickle-seconds", type=float, default=8.0)
+    parser.add_argument("--rows", type=int, default=13)
+    parser.add_argument("--form-type", default="bronze_med")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    kinds = ["gunicorn", "uvicorn"] if args.server == "both" else [args.server]
+    for offset, kind in enumerate(kinds):
+        run_scenario(kind, args, args.port + offset)
+
+
+if __name__ == "__main__":
+    main()
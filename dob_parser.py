@@ -0,0 +1,70 @@
+import datetime
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# --- DATE OF BIRTH PARSING ---
+# Registration exports only ever use a couple of layouts, so those are parsed
+# with a regex instead of going through pandas' format guessing on every cell.
+# Anything else (2-digit years, month names, US ordering...) still falls back
+# to pd.to_datetime(dayfirst=True) like the old inline code did. Note the fast
+# path reads year-first dates (YYYY-MM-DD, YYYY/MM/DD, YYYY.MM.DD) strictly as
+# year, month, day; dayfirst=True would turn 2007-01-03 into 1 March.
+
+DOB_CACHE_SIZE = 4096
+
+_DMY_PATTERN = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})")  # DD/MM/YYYY
+_YMD_PATTERN = re.compile(r"(\d{4})([/.-])(\d{1,2})\2(\d{1,2})(?:[ T]00:00(?::00)?)?")  # YYYY-MM-DD
+
+
+def _fast_parse(text):
+    match = _DMY_PATTERN.fullmatch(text)
+    if match:
+        day, month, year = match.groups()
+    else:
+        match = _YMD_PATTERN.fullmatch(text)
+        if not match:
+            return None
+        year, _, month, day = match.groups()
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        # e.g. 06/13/2007 - let pandas decide how to swap it
+        return None
+
+
+@lru_cache(maxsize=DOB_CACHE_SIZE)
+def _parse_text(text):
+    dt = _fast_parse(text)
+    if dt is not None:
+        return dt
+    try:
+        ts = pd.to_datetime(text, dayfirst=True)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if pd.isna(ts):
+        return None
+    return ts.date()
+
+
+def parse_dob(raw_dob):
+    """Return a datetime.date for a roster DOB cell, or None if it can't be read."""
+    if raw_dob is None or pd.isna(raw_dob):
+        return None
+    if isinstance(raw_dob, datetime.datetime):
+        return raw_dob.date()
+    if isinstance(raw_dob, datetime.date):
+        return raw_dob
+    text = str(raw_dob).strip()
+    if not text:
+        return None
+    return _parse_text(text)
+
+
+def cache_info():
+    return _parse_text.cache_info()
+
+
+def clear_cache():
+    _parse_text.cache_clear()
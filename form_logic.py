@@ -1,8 +1,10 @@
 import pandas as pd
-from pypdf.generic import BooleanObject, NameObject, DictionaryObject
-from pypdf import PdfReader, PdfWriter
 import math
 import os
+from dob_parser import parse_dob
+from incremental_writer import write_incremental
+from lean_templates import lean_template
+from pdf_backends import fill_pdf, get_backend
 
 # --- UTILS ---
 def clean_name(raw_name):
@@ -16,17 +18,107 @@ def clean_name(raw_name):
 
 def parse_date(raw_dob, use_full_year=True):
     dd, mm, yy = "", "", ""
-    if pd.notna(raw_dob):
-        try:
-            dt = pd.to_datetime(raw_dob, dayfirst=True)
-            dd = str(dt.day).zfill(2)
-            mm = str(dt.month).zfill(2)
-            yy = str(dt.year) if use_full_year else str(dt.year)[-2:]
-        except: pass
+    dt = parse_dob(raw_dob)
+    if dt is not None:
+        dd = str(dt.day).zfill(2)
+        mm = str(dt.month).zfill(2)
+        yy = str(dt.year) if use_full_year else str(dt.year)[-2:]
     return dd, mm, yy
 
+# --- OUTPUT ---
+# "full": every batch re-serializes the whole template through the PDF_BACKEND
+# engine (pypdf by default, see pdf_backends.py).
+# "incremental": the template bytes are copied as-is and only the changed
+# field objects are appended as a PDF incremental update (incremental_writer.py).
+# A batch that drops pages fills a copy of the template with those pages and
+# their fields removed (lean_templates.py), so their bytes leave the file in
+# every mode. PDF_STRIP_UNUSED=1 fills lean copies for every batch, with hidden
+# layers and Illustrator editing data taken out as well.
+PDF_OUTPUT_MODE = os.environ.get("PDF_OUTPUT_MODE", "full")
+PDF_STRIP_UNUSED = os.environ.get("PDF_STRIP_UNUSED", "0") == "1"
+
+def save_filled_pdf(template_path, data_map, out_path, copy_layers=False, drop_pages=()):
+    if PDF_STRIP_UNUSED or drop_pages:
+        # Fill a copy without the dropped pages, and with PDF_STRIP_UNUSED also
+        # without hidden layers or editor data (lean_templates.py)
+        template_path = lean_template(template_path, drop_pages, strip=PDF_STRIP_UNUSED)
+        drop_pages = ()
+
+    if PDF_OUTPUT_MODE == "incremental":
+        # The template's own catalog (and its /OCProperties) is kept untouched
+        write_incremental(template_path, data_map, out_path, drop_pages=drop_pages)
+        return
+
+    # Full rewrite through the PDF_BACKEND engine (pdf_backends.py)
+    fill_pdf(get_backend(), template_path, data_map, out_path, copy_layers=copy_layers, drop_pages=drop_pages)
+
+# --- BATCH PLANS ---
+# Each form has a plan_* function that maps the roster onto its sheets without
+# touching a PDF: one batch per output file, holding the field values and which
+# sheet slot each candidate landed in. process_* renders a plan to PDFs; the
+# /preview endpoint returns it as JSON instead.
+def slot_entry(row, candidate_number, slot):
+    dob = parse_dob(row.get("DateOfBirth", ""))
+    return {
+        "candidate": candidate_number,  # 1-based position in the roster
+        "slot": slot,                   # slot on the sheet the candidate was written to
+        "name": clean_name(row.get("AttendeeName", "")),
+        "dob": dob.isoformat() if dob is not None else "",
+    }
+
+def unused_pages(page_slots, slots):
+    """Pages of the sheet that none of the batch's candidates landed on.
+
+    page_slots is the template's slot capacity per page, front to back: sheet
+    slots are numbered 1..sum(page_slots) across the pages in that order.
+    """
+    used = {entry["slot"] for entry in slots}
+    unused, first = [], 1
+    for page, capacity in enumerate(page_slots):
+        if used.isdisjoint(range(first, first + capacity)):
+            unused.append(page)
+        first += capacity
+    return tuple(unused)
+
+def make_batch(filename, data_map, slots, page_slots, copy_layers=False):
+    # Only pages with a filled slot are emitted: a short batch leaves the back
+    # page out, a continuation that only uses back-page slots the front
+    return {
+        "filename": filename,
+        "data_map": data_map,
+        "slots": slots,
+        "copy_layers": copy_layers,
+        "drop_pages": unused_pages(page_slots, slots),
+    }
+
+def render_batches(batches, template_path, output_folder):
+    generated_files = []
+    for batch in batches:
+        out_name = os.path.join(output_folder, batch["filename"])
+        save_filled_pdf(template_path, batch["data_map"], out_name,
+                        copy_layers=batch["copy_layers"], drop_pages=batch["drop_pages"])
+        generated_files.append(out_name)
+    return generated_files
+
+def pages_saved(batches):
+    """Template pages the plan left out, over every output file."""
+    return sum(len(batch["drop_pages"]) for batch in batches)
+
+def bytes_saved(batches, template_path):
+    """Template bytes the left-out pages take out of the output files.
+
+    Measured on the template copies save_filled_pdf fills: the copy without a
+    batch's dropped pages against the same copy with every page.
+    """
+    dropping = [batch["drop_pages"] for batch in batches if batch["drop_pages"]]
+    if not dropping:
+        return 0
+    full_size = os.path.getsize(lean_template(template_path, strip=PDF_STRIP_UNUSED))
+    return sum(full_size - os.path.getsize(lean_template(template_path, drop_pages, strip=PDF_STRIP_UNUSED))
+               for drop_pages in dropping)
+
 # --- EMERGENCY FIRST AID LOGIC ---
-def process_efa(df, template_path, output_folder):
+def plan_efa(df):
     # --- CONSTANT DATA (HOST & FACILITY) ---
     HOST_DATA = {
         "Host Name": "City of Markham",
@@ -75,16 +167,15 @@ def process_efa(df, template_path, output_folder):
             
         candidate_map.append(entry)
 
-    BATCH_SIZE = 10
+    PAGE_SLOTS = (5, 5)  # candidates 1-5 on the front, 6-10 on the back
+    BATCH_SIZE = sum(PAGE_SLOTS)
     total_batches = math.ceil(len(df) / BATCH_SIZE)
-    generated_files = []
+    batches = []
 
     for b in range(total_batches):
         batch_df = df.iloc[b * BATCH_SIZE : (b + 1) * BATCH_SIZE]
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader)
         data_map = {}
+        slots = []
 
         # 1. APPLY HOST & FACILITY DATA
         for field, value in HOST_DATA.items():
@@ -93,22 +184,14 @@ def process_efa(df, template_path, output_folder):
         # 2. APPLY CANDIDATE DATA
         for i, (idx, row) in enumerate(batch_df.iterrows()):
             if i >= len(candidate_map): break
+            slots.append(slot_entry(row, b * BATCH_SIZE + i + 1, i + 1))
             
             fields = candidate_map[i]
             
             full_name = clean_name(row.get("AttendeeName", ""))
             
-            # Date Parsing (Matches your script: 2-digit year)
-            # We use the helper if available, or manual logic here to be safe
-            raw_dob = row.get("DateOfBirth", "")
-            dd, mm, yy = "", "", ""
-            if pd.notna(raw_dob):
-                try:
-                    dt = pd.to_datetime(raw_dob, dayfirst=True)
-                    dd = str(dt.day).zfill(2)
-                    mm = str(dt.month).zfill(2)
-                    yy = str(dt.year)
-                except: pass
+            # Date Parsing (4-digit year)
+            dd, mm, yy = parse_date(row.get("DateOfBirth", ""), use_full_year=True)
 
             data_map[fields["name"]] = full_name
             data_map[fields["addr"]] = str(row.get("Street", ""))
@@ -121,19 +204,15 @@ def process_efa(df, template_path, output_folder):
             data_map[fields["mm"]] = mm
             data_map[fields["yy"]] = yy
 
-        # Apply to all pages
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        out_name = os.path.join(output_folder, f"EFA_Test_Sheet_{b+1}.pdf")
-        with open(out_name, "wb") as f: 
-            writer.write(f)
-        generated_files.append(out_name)
+        batches.append(make_batch(f"EFA_Test_Sheet_{b+1}.pdf", data_map, slots, PAGE_SLOTS))
     
-    return generated_files
+    return batches
+
+def process_efa(df, template_path, output_folder):
+    return render_batches(plan_efa(df), template_path, output_folder)
 
 # --- BRONZE MEDALLION LOGIC ---
-def process_bronze_med(df, template_path, output_folder):
+def plan_bronze_med(df):
     # --- INVOICING DATA (HOST & FACILITY) ---
     HOST_DATA = {
         "host_name": "City of Markham",
@@ -184,17 +263,16 @@ def process_bronze_med(df, template_path, output_folder):
         {"base": "", "s": ".0.1.1.1.1.1.1"} # 13
     ]
 
-    BATCH_SIZE = 13
+    PAGE_SLOTS = (6, 7)  # candidates 1-6 on page 1, 7-13 on page 2
+    BATCH_SIZE = sum(PAGE_SLOTS)
     total_batches = math.ceil(len(df) / BATCH_SIZE)
-    generated_files = []
+    batches = []
 
     for b in range(total_batches):
         batch_df = df.iloc[b * BATCH_SIZE : (b + 1) * BATCH_SIZE]
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader)
         
         data_map = {}
+        slots = []
 
         # --- 1. APPLY HOST & FACILITY DATA ---
         for key, pdf_field in HOST_FIELD_MAP.items():
@@ -203,6 +281,7 @@ def process_bronze_med(df, template_path, output_folder):
         # --- 2. APPLY CANDIDATE DATA ---
         for i, (idx, row) in enumerate(batch_df.iterrows()):
             if i >= len(candidate_map): break
+            slots.append(slot_entry(row, b * BATCH_SIZE + i + 1, i + 1))
             
             slot = candidate_map[i]
             b_val = slot["base"]
@@ -225,18 +304,14 @@ def process_bronze_med(df, template_path, output_folder):
             data_map[f"DOBM{b_val}{s_val}"] = mm
             data_map[f"DOBY{b_val}{s_val}"] = yy
 
-        # Apply to all pages
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        out_name = os.path.join(output_folder, f"BronzeMed_Batch_{b+1}.pdf")
-        with open(out_name, "wb") as f:
-            writer.write(f)
-        generated_files.append(out_name)
+        batches.append(make_batch(f"BronzeMed_Batch_{b+1}.pdf", data_map, slots, PAGE_SLOTS))
     
-    return generated_files
+    return batches
+
+def process_bronze_med(df, template_path, output_folder):
+    return render_batches(plan_bronze_med(df), template_path, output_folder)
 # --- BRONZE CROSS LOGIC ---
-def process_bronze_cross(df, template_path, output_folder):
+def plan_bronze_cross(df):
     # --- INVOICING DATA (HOST & FACILITY) ---
     HOST_DATA = {
         "host_name": "City of Markham",
@@ -294,17 +369,16 @@ def process_bronze_cross(df, template_path, output_folder):
         {"p": "13", "s": ".1.1.1.1.1"},     # 13
     ]
 
-    BATCH_SIZE = 13
+    PAGE_SLOTS = (6, 7)  # candidates 1-6 on page 1, 7-13 on page 2
+    BATCH_SIZE = sum(PAGE_SLOTS)
     total_batches = math.ceil(len(df) / BATCH_SIZE)
-    generated_files = []
+    batches = []
 
     for b in range(total_batches):
         batch_df = df.iloc[b * BATCH_SIZE : (b + 1) * BATCH_SIZE]
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader)
         
         data_map = {}
+        slots = []
         
         # --- 1. APPLY HOST & FACILITY DATA ---
         for key, pdf_field in HOST_FIELD_MAP.items():
@@ -313,6 +387,7 @@ def process_bronze_cross(df, template_path, output_folder):
         # --- 2. APPLY CANDIDATE DATA ---
         for i, (idx, row) in enumerate(batch_df.iterrows()):
             if i >= len(candidate_map): break
+            slots.append(slot_entry(row, b * BATCH_SIZE + i + 1, i + 1))
             
             slot = candidate_map[i]
             p = slot.get("p", "") 
@@ -364,18 +439,14 @@ def process_bronze_cross(df, template_path, output_folder):
             else:
                 data_map[f_addr] = address_val
 
-        # Apply to all pages
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        out_name = os.path.join(output_folder, f"BronzeCross_Batch_{b+1}.pdf")
-        with open(out_name, "wb") as f:
-            writer.write(f)
-        generated_files.append(out_name)
+        batches.append(make_batch(f"BronzeCross_Batch_{b+1}.pdf", data_map, slots, PAGE_SLOTS))
     
-    return generated_files
+    return batches
+
+def process_bronze_cross(df, template_path, output_folder):
+    return render_batches(plan_bronze_cross(df), template_path, output_folder)
 # --- BRONZE STAR LOGIC ---
-def process_bronze_star(df, template_path, output_folder):
+def plan_bronze_star(df):
     # --- INVOICING DATA (HOST & FACILITY) ---
     HOST_DATA = {
         "host_name": "City of Markham",
@@ -426,17 +497,16 @@ def process_bronze_star(df, template_path, output_folder):
         {"type": "dot", "s": ".1.1.1.1.1.1"}, # 13
     ]
 
-    BATCH_SIZE = 13
+    PAGE_SLOTS = (6, 7)  # candidates 1-6 on page 1, 7-13 on page 2
+    BATCH_SIZE = sum(PAGE_SLOTS)
     total_batches = math.ceil(len(df) / BATCH_SIZE)
-    generated_files = []
+    batches = []
 
     for b in range(total_batches):
         batch_df = df.iloc[b * BATCH_SIZE : (b + 1) * BATCH_SIZE]
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader)
         
         data_map = {}
+        slots = []
         
         # --- 1. APPLY HOST & FACILITY DATA ---
         for key, pdf_field in HOST_FIELD_MAP.items():
@@ -445,6 +515,7 @@ def process_bronze_star(df, template_path, output_folder):
         # --- 2. APPLY CANDIDATE DATA ---
         for i, (idx, row) in enumerate(batch_df.iterrows()):
             if i >= len(candidate_map): break
+            slots.append(slot_entry(row, b * BATCH_SIZE + i + 1, i + 1))
             
             slot = candidate_map[i]
             
@@ -478,18 +549,14 @@ def process_bronze_star(df, template_path, output_folder):
             data_map[f_mm] = mm
             data_map[f_yy] = yy
 
-        # Apply to all pages
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        out_name = os.path.join(output_folder, f"BronzeStar_Batch_{b+1}.pdf")
-        with open(out_name, "wb") as f:
-            writer.write(f)
-        generated_files.append(out_name)
+        batches.append(make_batch(f"BronzeStar_Batch_{b+1}.pdf", data_map, slots, PAGE_SLOTS))
     
-    return generated_files
+    return batches
+
+def process_bronze_star(df, template_path, output_folder):
+    return render_batches(plan_bronze_star(df), template_path, output_folder)
 # --- STANDARD FIRST AID LOGIC ---
-def process_sfa(df, template_path, output_folder):
+def plan_sfa(df):
     # --- CONSTANT DATA (HOST & FACILITY) ---
     HOST_DATA = {
         "Host Name": "City of Markham",
@@ -521,17 +588,16 @@ def process_sfa(df, template_path, output_folder):
         }
         candidate_map.append(entry)
 
-    BATCH_SIZE = 10
+    PAGE_SLOTS = (5, 5)  # candidates 1-5 on the front, 6-10 on the back
+    BATCH_SIZE = sum(PAGE_SLOTS)
     total_batches = math.ceil(len(df) / BATCH_SIZE)
-    generated_files = []
+    batches = []
 
     for b in range(total_batches):
         batch_df = df.iloc[b * BATCH_SIZE : (b + 1) * BATCH_SIZE]
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader)
         
         data_map = {}
+        slots = []
 
         # 1. APPLY HOST & FACILITY DATA
         for field, value in HOST_DATA.items():
@@ -540,22 +606,14 @@ def process_sfa(df, template_path, output_folder):
         # 2. APPLY CANDIDATE DATA
         for i, (idx, row) in enumerate(batch_df.iterrows()):
             if i >= len(candidate_map): break
+            slots.append(slot_entry(row, b * BATCH_SIZE + i + 1, i + 1))
             
             fields = candidate_map[i]
             
             full_name = clean_name(row.get("AttendeeName", ""))
             
             # Parse Date (4-digit year to match your SFA script)
-            # We bypass the helper to ensure 4-digit year is forced as per your snippet: yy = str(dt.year)
-            raw_dob = row.get("DateOfBirth", "")
-            dd, mm, yy = "", "", ""
-            if pd.notna(raw_dob):
-                try:
-                    dt = pd.to_datetime(raw_dob, dayfirst=True)
-                    dd = str(dt.day).zfill(2)
-                    mm = str(dt.month).zfill(2)
-                    yy = str(dt.year) # 4-digit year
-                except: pass
+            dd, mm, yy = parse_date(row.get("DateOfBirth", ""), use_full_year=True)
 
             data_map[fields["name"]] = full_name
             data_map[fields["addr"]] = str(row.get("Street", ""))
@@ -569,19 +627,15 @@ def process_sfa(df, template_path, output_folder):
             data_map[fields["mm"]] = mm
             data_map[fields["yy"]] = yy
 
-        # Apply to all pages
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        out_name = os.path.join(output_folder, f"SFA_Test_Sheet_{b+1}.pdf")
-        with open(out_name, "wb") as f:
-            writer.write(f)
-        generated_files.append(out_name)
+        batches.append(make_batch(f"SFA_Test_Sheet_{b+1}.pdf", data_map, slots, PAGE_SLOTS))
     
-    return generated_files
+    return batches
+
+def process_sfa(df, template_path, output_folder):
+    return render_batches(plan_sfa(df), template_path, output_folder)
  
 # --- AIRWAY MANAGEMENT LOGIC ---
-def process_airway_management(df, template_path, output_folder):
+def plan_airway_management(df):
     # --- INVOICING DATA (HOST & FACILITY) ---
     HOST_FIELD_MAP = {
         # FRONT PAGE
@@ -630,17 +684,16 @@ def process_airway_management(df, template_path, output_folder):
         }
         candidate_map.append(entry)
 
-    BATCH_SIZE = 10
+    PAGE_SLOTS = (5, 5)  # candidates 1-5 on the front, 6-10 on the back
+    BATCH_SIZE = sum(PAGE_SLOTS)
     total_batches = math.ceil(len(df) / BATCH_SIZE)
-    generated_files = []
+    batches = []
 
     for b in range(total_batches):
         batch_df = df.iloc[b * BATCH_SIZE : (b + 1) * BATCH_SIZE]
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader)
         
         data_map = {}
+        slots = []
         
         # 1. APPLY HOST & FACILITY DATA
         for field_name, value in HOST_FIELD_MAP.items():
@@ -649,6 +702,7 @@ def process_airway_management(df, template_path, output_folder):
         # 2. APPLY CANDIDATE DATA
         for i, (idx, row) in enumerate(batch_df.iterrows()):
             if i >= len(candidate_map): break
+            slots.append(slot_entry(row, b * BATCH_SIZE + i + 1, i + 1))
             fields = candidate_map[i]
             
             full_name = clean_name(row.get("AttendeeName", ""))
@@ -667,36 +721,17 @@ def process_airway_management(df, template_path, output_folder):
             data_map[fields["mm"]] = mm
             data_map[fields["yy"]] = yy
 
-        # Apply data to all pages
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        # =========================================================
-        # CRITICAL FIX 1: Fix "Floating Text" / Font Issues
-        #Forces viewer to regenerate field appearance using native fonts
-        # =========================================================
-        if "/AcroForm" not in writer.root_object:
-            writer.root_object.update({
-                NameObject("/AcroForm"): DictionaryObject()
-            })
-        writer.root_object["/AcroForm"][NameObject("/NeedAppearances")] = BooleanObject(True)
-
-        # =========================================================
-        # CRITICAL FIX 2: Fix "French text on top of English"
-        # Copies Layer settings to ensure hidden layers stay hidden
-        # =========================================================
-        if "/OCProperties" in reader.root_object:
-            writer.root_object[NameObject("/OCProperties")] = \
-                reader.root_object["/OCProperties"].clone(writer)
-
-        out_name = os.path.join(output_folder, f"Airway_Mgmt_Batch_{b+1}.pdf")
-        with open(out_name, "wb") as f: writer.write(f)
-        generated_files.append(out_name)
+        batches.append(make_batch(f"Airway_Mgmt_Batch_{b+1}.pdf", data_map, slots, PAGE_SLOTS, copy_layers=True))
     
-    return generated_files
+    return batches
+
+def process_airway_management(df, template_path, output_folder):
+    return render_batches(plan_airway_management(df), template_path, output_folder)
 
 # --- NATIONAL LIFEGUARD POOL LOGIC ---
-def process_national_lifeguard(df, template_path, output_folder):
+# number_field: name of the small corner box used for continuation numbering.
+# The 2022 Pool sheet calls it "1X", the 2025 Recert sheet calls it "X1".
+def plan_national_lifeguard(df, file_prefix="NL_Pool", number_field="{p}X"):
     # --- HOST DATA ---
     HOST_DATA = {
         "Host Name": "City of Markham",
@@ -711,7 +746,9 @@ def process_national_lifeguard(df, template_path, output_folder):
         "Exam Phone": "4703590 EXT 4342",
     }
     
-    generated_files = []
+    PAGE_SLOTS = (4, 4)  # slots 1-4 on the front, 5-8 on the back
+    SHEET_SIZE = sum(PAGE_SLOTS)
+    batches = []
     
     # --- HELPER: MAP ROW TO SLOT ---
     def get_slot_data(row, field_id, visible_number):
@@ -743,15 +780,7 @@ def process_national_lifeguard(df, template_path, output_folder):
         phone = str(row.get("AttendeePhone", ""))
         
         # 3. DOB Formatting
-        raw_dob = row.get("DateOfBirth", "")
-        dd, mm, yy = "", "", ""
-        if pd.notna(raw_dob):
-            try:
-                dt = pd.to_datetime(raw_dob, dayfirst=True)
-                dd = str(dt.day).zfill(2)
-                mm = str(dt.month).zfill(2)
-                yy = str(dt.year)
-            except: pass
+        dd, mm, yy = parse_date(row.get("DateOfBirth", ""), use_full_year=True)
 
         # 4. Final Mapping Dictionary
         data = {
@@ -770,76 +799,67 @@ def process_national_lifeguard(df, template_path, output_folder):
 
         # 5. Handle Continuation Numbering (Write '9', '10' etc. in corner box)
         if visible_number > 8:
-            data[f"{p}X"] = str(visible_number)
+            data[number_field.format(p=p)] = str(visible_number)
 
         return data
 
-    # --- SAVE FUNCTION ---
-    def _finalize_and_save(writer, reader, data_map, index, suffix):
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        # Fix: Force Adobe/Chrome to re-render text
-        if "/AcroForm" not in writer.root_object:
-            writer.root_object.update({NameObject("/AcroForm"): DictionaryObject()})
-        writer.root_object["/AcroForm"][NameObject("/NeedAppearances")] = BooleanObject(True)
-
-        # Fix: Clone Layer Settings
-        if "/OCProperties" in reader.root_object:
-            writer.root_object[NameObject("/OCProperties")] = \
-                reader.root_object["/OCProperties"].clone(writer)
-
-        out_name = os.path.join(output_folder, f"NL_Pool_{index}_{suffix}.pdf")
-        with open(out_name, "wb") as f:
-            writer.write(f)
-        generated_files.append(out_name)
+    # --- BATCH FUNCTION ---
+    def _add_batch(data_map, slots, index, suffix):
+        batches.append(make_batch(f"{file_prefix}_{index}_{suffix}.pdf", data_map, slots, PAGE_SLOTS, copy_layers=True))
 
     # --- MAIN PROCESSING LOGIC ---
     total_candidates = len(df)
     
     # 1. Process Master Sheet (First 8 Candidates)
-    batch1 = df.iloc[0:8]
+    batch1 = df.iloc[0:SHEET_SIZE]
     if not batch1.empty:
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader) 
-
         data_map = HOST_DATA.copy()
+        slots = []
         
         for i, (idx, row) in enumerate(batch1.iterrows()):
             current_num = i + 1  # Slots 1-8
             data_map.update(get_slot_data(row, field_id=current_num, visible_number=current_num))
+            slots.append(slot_entry(row, current_num, current_num))
 
-        _finalize_and_save(writer, reader, data_map, 1, "Master")
+        _add_batch(data_map, slots, 1, "Master")
 
     # 2. Process Continuation Sheets (Remaining Candidates in groups of 8)
-    start_index = 8
+    start_index = SHEET_SIZE
     batch_counter = 2
     
     while start_index < total_candidates:
-        end_index = start_index + 8
+        end_index = start_index + SHEET_SIZE
         batch_next = df.iloc[start_index:end_index]
         
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader) # Duplicate full form
-        
         data_map = HOST_DATA.copy()
+        slots = []
 
         for i, (idx, row) in enumerate(batch_next.iterrows()):
             slot_id = i + 1               # Reuse PDF slots 1-8
             real_number = (start_index + 1) + i # Actual Candidate # (e.g. 9, 10...)
             data_map.update(get_slot_data(row, field_id=slot_id, visible_number=real_number))
+            slots.append(slot_entry(row, real_number, slot_id))
         
-        _finalize_and_save(writer, reader, data_map, batch_counter, "Continuation")
+        _add_batch(data_map, slots, batch_counter, "Continuation")
         
-        start_index += 8
+        start_index += SHEET_SIZE
         batch_counter += 1
 
-    return generated_files
+    return batches
+
+def process_national_lifeguard(df, template_path, output_folder, file_prefix="NL_Pool", number_field="{p}X"):
+    return render_batches(plan_national_lifeguard(df, file_prefix, number_field), template_path, output_folder)
+
+# --- NATIONAL LIFEGUARD RECERT LOGIC ---
+# Same 8-slot layout as the Pool sheet (.1 last name ... .13 day)
+def plan_nl_recert(df):
+    return plan_national_lifeguard(df, file_prefix="NL_Recert", number_field="X{p}")
+
+def process_nl_recert(df, template_path, output_folder):
+    return render_batches(plan_nl_recert(df), template_path, output_folder)
 
 # --- LEADERSHIP MASTERSHEET LOGIC ---
-def process_leadership_mastersheet(df, template_path, output_folder):
+def plan_leadership_mastersheet(df):
     # --- HOST DATA ---
     HOST_DATA = {
         "Host Name": "City of Markham",
@@ -855,8 +875,11 @@ def process_leadership_mastersheet(df, template_path, output_folder):
         "Exam Fees Attached": "/Yes"
     }
 
+    PAGE_SLOTS = (3, 6)  # candidates 1-3 on the front page, slots 4-9 on the back
+    MASTER_SIZE = sum(PAGE_SLOTS)
+    CONTINUATION_SIZE = PAGE_SLOTS[1]  # continuations only reuse the back page slots
     total_candidates = len(df)
-    generated_files = []
+    batches = []
 
     # Helper to get slot data
     def get_slot_data(row, field_id, visible_number):
@@ -870,13 +893,8 @@ def process_leadership_mastersheet(df, template_path, output_folder):
         full_address = f"{street}, {city} {zip_code}".strip(", ")
 
         # DOB Formatting: YY/MM/DD
-        raw_dob = row.get("DateOfBirth", "")
-        formatted_dob = ""
-        if pd.notna(raw_dob):
-            try:
-                dt = pd.to_datetime(raw_dob, dayfirst=True)
-                formatted_dob = dt.strftime("%y/%m/%d")
-            except: pass
+        dt = parse_dob(row.get("DateOfBirth", ""))
+        formatted_dob = dt.strftime("%y/%m/%d") if dt is not None else ""
 
         data = {
             f"{p}.1": full_name,
@@ -893,58 +911,34 @@ def process_leadership_mastersheet(df, template_path, output_folder):
 
         return data
 
-    # Helper to save file
-    def _finalize_and_save(writer, reader, data_map, filename):
-        for page in writer.pages:
-            writer.update_page_form_field_values(page, data_map)
-
-        # Force Fonts & Layers (Critical for new PDF forms)
-        if "/AcroForm" not in writer.root_object:
-            writer.root_object.update({NameObject("/AcroForm"): DictionaryObject()})
-        writer.root_object["/AcroForm"][NameObject("/NeedAppearances")] = BooleanObject(True)
-
-        if "/OCProperties" in reader.root_object:
-            writer.root_object[NameObject("/OCProperties")] = \
-                reader.root_object["/OCProperties"].clone(writer)
-
-        out_path = os.path.join(output_folder, filename)
-        with open(out_path, "wb") as f:
-            writer.write(f)
-        generated_files.append(out_path)
+    # Helper to record one output file
+    def _add_batch(data_map, slots, filename):
+        batches.append(make_batch(filename, data_map, slots, PAGE_SLOTS, copy_layers=True))
 
     # --- 1. MASTER FILE (Candidates 1-9) ---
-    batch1 = df.iloc[0:9]
+    batch1 = df.iloc[0:MASTER_SIZE]
     if not batch1.empty:
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.append(reader) 
-
         data_map = HOST_DATA.copy()
         data_map["Total Enrolled"] = str(total_candidates)
+        slots = []
 
         for i, (idx, row) in enumerate(batch1.iterrows()):
             current_num = i + 1  # 1, 2, 3... 9
             # For the Master sheet, Field ID and Candidate Number are the same
             data_map.update(get_slot_data(row, field_id=current_num, visible_number=current_num))
+            slots.append(slot_entry(row, current_num, current_num))
 
-        _finalize_and_save(writer, reader, data_map, "Leadership_Master_1.pdf")
+        _add_batch(data_map, slots, "Leadership_Master_1.pdf")
 
     # --- 2. CONTINUATION FILES (Candidates 10+) ---
-    start_index = 9
+    start_index = MASTER_SIZE
     batch_counter = 2
     
     while start_index < total_candidates:
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        
-        # Copy PDF and remove Page 1 (Front page)
-        writer.append(reader)
-        if len(writer.pages) > 0:
-            del writer.pages[0]
-
-        batch_next = df.iloc[start_index : start_index + 6]
+        batch_next = df.iloc[start_index : start_index + CONTINUATION_SIZE]
         data_map = HOST_DATA.copy()
         data_map["Total Enrolled"] = str(total_candidates)
+        slots = []
 
         # Loop through the batch (up to 6 people)
         for i, (idx, row) in enumerate(batch_next.iterrows()):
@@ -956,10 +950,15 @@ def process_leadership_mastersheet(df, template_path, output_folder):
             actual_candidate_num = (start_index + 1) + i
             
             data_map.update(get_slot_data(row, field_id=pdf_field_id, visible_number=actual_candidate_num))
+            slots.append(slot_entry(row, actual_candidate_num, pdf_field_id))
 
-        _finalize_and_save(writer, reader, data_map, f"Leadership_Continuation_{batch_counter}.pdf")
+        # Continuation copies only fill back-page slots, so Page 1 (Front page) is dropped
+        _add_batch(data_map, slots, f"Leadership_Continuation_{batch_counter}.pdf")
         
-        start_index += 6
+        start_index += CONTINUATION_SIZE
         batch_counter += 1
 
-    return generated_files
\ No newline at end of file
+    return batches
+
+def process_leadership_mastersheet(df, template_path, output_folder):
+    return render_batches(plan_leadership_mastersheet(df), template_path, output_folder)
@@ -0,0 +1,27 @@
+# Picked up automatically by `gunicorn app:app` (see procfile).
+#
+# PRELOAD_TEMPLATES=1 loads the app in the master process and parses every
+# FORM_CONFIG template there before forking, so workers share them instead
+# of each paying the parse (and the memory) on their first request.
+import gc
+import os
+
+preload_templates = os.environ.get("PRELOAD_TEMPLATES", "0") == "1"
+preload_app = preload_templates
+
+
+def when_ready(server):
+    if not preload_templates:
+        return
+    from app import preload_templates as preload
+    preload()
+    # Move everything allocated so far out of the GC's reach so collections in
+    # the workers don't write to (and un-share) those pages.
+    gc.freeze()
+    server.log.info("Preloaded PDF templates before forking workers")
+
+
+def post_worker_init(worker):
+    # Each worker deletes expired download archives even while no new ZIP is stored
+    from archive_store import start_sweeper
+    start_sweeper()
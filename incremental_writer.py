@@ -0,0 +1,263 @@
+"""Incremental-update output for filled test sheets.
+
+Instead of re-serializing the whole template for every batch, the output file
+is the untouched template bytes (copied by the kernel, see shutil.copyfile)
+followed by a PDF incremental-update section: just the field, widget and
+AcroForm dictionaries that changed, plus a cross-reference stream whose
+/Prev points back at the template's own xref. A batch therefore costs a few
+kilobytes of new bytes on top of the template.
+
+Field matching follows pypdf's PdfWriter.update_page_form_field_values
+(qualified name or /T of the widget's field, later keys win), so the values
+a reader sees are the same as in the full-rewrite output.
+"""
+import hashlib
+import io
+import mmap
+import os
+import re
+import shutil
+import struct
+import threading
+from functools import lru_cache
+
+from pypdf import PdfReader
+from pypdf.generic import (ArrayObject, BooleanObject, ByteStringObject, DictionaryObject,
+                           IndirectObject, NameObject, NumberObject, TextStringObject)
+
+
+class _Template:
+    """A parsed template: mmapped bytes, the reader and a widget index.
+
+    Shared by every batch in the process (both output modes). pypdf readers
+    parse lazily through one stream, so callers hold `lock` while reading.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self.data)
+        self.lock = threading.Lock()
+        self.reader = PdfReader(self.data)
+        self.prev_xref = self._last_startxref()
+        self.uses_xref_stream = self.data[self.prev_xref:self.prev_xref + 4] != b"xref"
+        self.widgets = self._index_widgets()
+
+    def resolve_all(self):
+        """Parses every object now, e.g. before forking so workers share the result."""
+        with self.lock:
+            for generation, objects in list(self.reader.xref.items()):
+                for idnum in list(objects):
+                    self.reader.get_object(IndirectObject(idnum, generation, self.reader))
+            for idnum in list(self.reader.xref_objStm):
+                self.reader.get_object(IndirectObject(idnum, 0, self.reader))
+        return self
+
+    def _last_startxref(self):
+        tail = self.data[max(0, self.size - 1024):]
+        return int(re.findall(rb"startxref\s+(\d+)", tail)[-1])
+
+    def _index_widgets(self):
+        # Per page: (widget ref, field ref, qualified field name, field /T, field /FT)
+        pages = []
+        for page in self.reader.pages:
+            entries = []
+            for annot_ref in page.get("/Annots", []):
+                annot = annot_ref.get_object()
+                if annot.get("/Subtype", "") != "/Widget" or not isinstance(annot_ref, IndirectObject):
+                    continue
+                if "/FT" in annot and "/T" in annot:
+                    field_ref = annot_ref
+                else:
+                    field_ref = annot.raw_get("/Parent") if "/Parent" in annot else None
+                if not isinstance(field_ref, IndirectObject):
+                    continue
+                field = field_ref.get_object()
+                entries.append((annot_ref, field_ref, _qualified_name(field), field.get("/T"), field.get("/FT")))
+            pages.append(entries)
+        return pages
+
+
+def _qualified_name(field):
+    names = []
+    while field is not None:
+        if "/T" in field:
+            names.append(str(field["/T"]))
+        field = field.get("/Parent")
+        field = field.get_object() if field is not None else None
+    return ".".join(reversed(names))
+
+
+@lru_cache(maxsize=16)
+def _load_template(path, mtime):
+    return _Template(path)
+
+
+def load_template(path):
+    return _load_template(os.path.abspath(path), os.path.getmtime(path))
+
+
+class _Update:
+    """The set of objects rewritten by one incremental update."""
+    def __init__(self, template):
+        self.template = template
+        self.objects = {}  # idnum -> (generation, object copy)
+
+    def edit(self, ref):
+        if ref.idnum not in self.objects:
+            original = ref.get_object()
+            self.objects[ref.idnum] = (ref.generation, DictionaryObject(original))
+        return self.objects[ref.idnum][1]
+
+
+def matching_widgets(template, data_map, kept_pages):
+    """Yields (widget ref, field ref, qualified name, field /FT, value) for every data_map key a widget matches.
+
+    Same rule as pypdf's update_page_form_field_values: a key matches the
+    field's qualified name or /T, and later keys win (they are yielded last).
+    Also used by the pikepdf backend (pdf_backends.py) and the XFDF export.
+    """
+    order = {name: i for i, name in enumerate(data_map)}
+    for page_index in kept_pages:
+        for widget_ref, field_ref, qualified, short_name, field_type in template.widgets[page_index]:
+            matches = {key for key in (qualified, short_name) if key in order}
+            for key in sorted(matches, key=order.get):
+                yield widget_ref, field_ref, qualified, field_type, data_map[key]
+
+
+def _apply_fields(update, data_map, kept_pages):
+    for widget_ref, field_ref, _, field_type, value in matching_widgets(update.template, data_map, kept_pages):
+        field = update.edit(field_ref)
+        if field_type == "/Btn":
+            field[NameObject("/V")] = NameObject(value) if value.startswith("/") else TextStringObject(value)
+            widget = update.edit(widget_ref)
+            states = widget.get("/AP", {}).get("/N", {})
+            widget[NameObject("/AS")] = NameObject(value if value in states else "/Off")
+        else:
+            field[NameObject("/V")] = TextStringObject(value)
+            if field_type in ("/Tx", "/Ch"):
+                # Drop the blank appearance so viewers build one from /V (NeedAppearances)
+                widget = update.edit(widget_ref)
+                if "/AP" in widget:
+                    del widget["/AP"]
+
+
+def _drop_pages(update, drop_pages):
+    reader = update.template.reader
+    for index in sorted(drop_pages, reverse=True):
+        page_ref = reader.pages[index].indirect_reference
+        parent_ref = reader.pages[index].raw_get("/Parent")
+        parent = update.edit(parent_ref)
+        parent[NameObject("/Kids")] = ArrayObject(k for k in parent["/Kids"] if k.idnum != page_ref.idnum)
+        while parent_ref is not None:
+            parent = update.edit(parent_ref)
+            parent[NameObject("/Count")] = NumberObject(parent["/Count"] - 1)
+            parent_ref = parent.raw_get("/Parent") if "/Parent" in parent else None
+
+
+def _set_need_appearances(update):
+    root = update.template.reader.trailer["/Root"]
+    acroform_ref = root.raw_get("/AcroForm")
+    if isinstance(acroform_ref, IndirectObject):
+        acroform = update.edit(acroform_ref)
+    else:
+        catalog = update.edit(update.template.reader.trailer.raw_get("/Root"))
+        acroform = DictionaryObject(acroform_ref or {})
+        catalog[NameObject("/AcroForm")] = acroform
+    acroform[NameObject("/NeedAppearances")] = BooleanObject(True)
+
+
+# --- SERIALIZATION ---
+def _xref_runs(numbers):
+    runs = []
+    for num in sorted(numbers):
+        if runs and runs[-1][0] + runs[-1][1] == num:
+            runs[-1][1] += 1
+        else:
+            runs.append([num, 1])
+    return runs
+
+
+def _serialize(update):
+    template = update.template
+    trailer = template.reader.trailer
+    out = io.BytesIO()
+    out.write(b"\n")
+    offsets = {}
+    for idnum in sorted(update.objects):
+        generation, obj = update.objects[idnum]
+        offsets[idnum] = (template.size + out.tell(), generation)
+        out.write(f"{idnum} {generation} obj\n".encode())
+        obj.write_to_stream(out)
+        out.write(b"\nendobj\n")
+
+    body_digest = hashlib.md5(out.getvalue()).digest()
+    ids = trailer.get("/ID")
+    id_array = ArrayObject([ids[0] if ids else ByteStringObject(body_digest), ByteStringObject(body_digest)])
+    size = int(trailer["/Size"])
+
+    if template.uses_xref_stream:
+        # The xref stream is itself a new object, numbered after the template's last one
+        xref_num = size
+        offsets[xref_num] = (template.size + out.tell(), 0)
+        runs = _xref_runs(offsets)
+        rows = b"".join(struct.pack(">BIH", 1, offsets[n][0], offsets[n][1])
+                        for start, count in runs for n in range(start, start + count))
+        xref = DictionaryObject({
+            NameObject("/Type"): NameObject("/XRef"),
+            NameObject("/Size"): NumberObject(size + 1),
+            NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(4), NumberObject(2)]),
+            NameObject("/Index"): ArrayObject(NumberObject(v) for run in runs for v in run),
+            NameObject("/Prev"): NumberObject(template.prev_xref),
+            NameObject("/Root"): trailer.raw_get("/Root"),
+            NameObject("/ID"): id_array,
+            NameObject("/Length"): NumberObject(len(rows)),
+        })
+        if "/Info" in trailer:
+            xref[NameObject("/Info")] = trailer.raw_get("/Info")
+        startxref = offsets[xref_num][0]
+        out.write(f"{xref_num} 0 obj\n".encode())
+        xref.write_to_stream(out)
+        out.write(b"\nstream\n" + rows + b"\nendstream\nendobj\n")
+    else:
+        startxref = template.size + out.tell()
+        out.write(b"xref\n")
+        for start, count in _xref_runs(offsets):
+            out.write(f"{start} {count}\n".encode())
+            for n in range(start, start + count):
+                out.write(f"{offsets[n][0]:010d} {offsets[n][1]:05d} n\r\n".encode())
+        new_trailer = DictionaryObject({
+            NameObject("/Size"): NumberObject(size),
+            NameObject("/Prev"): NumberObject(template.prev_xref),
+            NameObject("/Root"): trailer.raw_get("/Root"),
+            NameObject("/ID"): id_array,
+        })
+        if "/Info" in trailer:
+            new_trailer[NameObject("/Info")] = trailer.raw_get("/Info")
+        out.write(b"trailer\n")
+        new_trailer.write_to_stream(out)
+        out.write(b"\n")
+
+    out.write(f"startxref\n{startxref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def build_update(template_path, data_map, drop_pages=()):
+    """Returns (template, update bytes) for filling data_map into the template."""
+    template = load_template(template_path)
+    update = _Update(template)
+    kept_pages = [i for i in range(len(template.widgets)) if i not in set(drop_pages)]
+    with template.lock:
+        _apply_fields(update, data_map, kept_pages)
+        _set_need_appearances(update)
+        if drop_pages:
+            _drop_pages(update, drop_pages)
+        update_bytes = _serialize(update)
+    return template, update_bytes
+
+
+def write_incremental(template_path, data_map, out_path, drop_pages=()):
+    """Writes template + an incremental update with data_map filled in to out_path."""
+    template, update_bytes = build_update(template_path, data_map, drop_pages)
+    shutil.copyfile(template_path, out_path)  # copy_file_range/sendfile where the OS has it
+    with open(out_path, "ab") as f:
+        f.write(update_bytes)
@@ -0,0 +1,178 @@
+"""Lean copies of the templates, with what no viewer ever shows taken out.
+
+With PDF_STRIP_UNUSED=1, save_filled_pdf fills a lean copy of the template
+instead of the original (both output modes, every PDF_BACKEND). The copy is
+built once per template and set of dropped pages, and kept in
+LEAN_TEMPLATE_FOLDER so other workers and restarts reuse it. Taken out:
+
+    * page content marked with an optional-content layer that is off in the
+      template's default view (the hidden French layer), so the layer can't
+      show through even if a viewer ignores /OCProperties. Only the pages'
+      own content streams are scanned: layer content inside form XObjects or
+      annotation appearances stays (none of the current templates has any)
+    * /PieceInfo, the editing data Illustrator saves with each page (every
+      layer again, in Illustrator's own format, often half the file)
+    * /Thumb page thumbnails
+    * the pages a batch drops (drop_pages), together with their content,
+      resources and the fields that have no widget on any other page (they
+      only ever showed template defaults there)
+    * anything left unreferenced by the above, since the copy is rewritten
+      from the catalog down
+
+The copy is written by qpdf when pikepdf is installed, which packs the small
+objects into compressed object streams the way the originals are; pypdf
+can't write those, so without pikepdf a copy can come out a little larger
+than a template that has little to strip (EFA).
+
+Field names, widgets and the visible English content are unchanged.
+
+Without PDF_STRIP_UNUSED, a batch that drops pages still fills a copy, built
+with strip=False: only the dropped pages, their widgets and fields and what
+they alone reference are taken out. Unlinking a page from the page tree
+alone would leave it in the file, reachable from its widgets' /P through
+/AcroForm /Fields.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from functools import lru_cache
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ContentStream, IndirectObject, NameObject
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+LEAN_TEMPLATE_FOLDER = os.environ.get("LEAN_TEMPLATE_FOLDER", "/tmp/outputs/lean_templates")
+LEAN_VERSION = 1  # bump when what gets stripped changes, so old copies aren't reused
+
+UNSHOWN_PAGE_KEYS = ("/PieceInfo", "/Thumb")
+
+
+# --- HIDDEN LAYERS ---
+def hidden_layers(root):
+    """Object numbers of the optional-content groups that are off in the default view."""
+    properties = root.get("/OCProperties")
+    if properties is None:
+        return set()
+    groups = [ref.idnum for ref in properties.get("/OCGs", []) if isinstance(ref, IndirectObject)]
+    default = properties.get("/D", {})
+    if default.get("/BaseState") == "/OFF":
+        shown = {ref.idnum for ref in default.get("/ON", []) if isinstance(ref, IndirectObject)}
+        return {idnum for idnum in groups if idnum not in shown}
+    return {ref.idnum for ref in default.get("/OFF", []) if isinstance(ref, IndirectObject)}
+
+
+def strip_hidden_content(page, pdf, hidden):
+    """Drops the page's /OC marked-content sections for hidden layers; returns the ops removed.
+
+    Only the page's content stream is edited, not the form XObjects it draws.
+    """
+    properties = page.get("/Resources", {}).get("/Properties", {})
+    hidden_tags = {name for name in properties
+                   if isinstance(properties.raw_get(name), IndirectObject) and properties.raw_get(name).idnum in hidden}
+    if not hidden_tags or page.get("/Contents") is None:
+        return 0
+
+    content = ContentStream(page.get_contents(), pdf)
+    kept, removed, depth = [], 0, 0
+    for operands, operator in content.operations:
+        if depth:
+            # Inside a hidden section: skip everything up to its matching EMC
+            if operator in (b"BDC", b"BMC"):
+                depth += 1
+            elif operator == b"EMC":
+                depth -= 1
+            removed += 1
+        # The properties operand may also be an inline dictionary, which names no layer
+        elif (operator == b"BDC" and operands[0] == "/OC" and isinstance(operands[1], NameObject)
+              and operands[1] in hidden_tags):
+            depth = 1
+            removed += 1
+        else:
+            kept.append((operands, operator))
+    if removed:
+        content.operations = kept
+        page.replace_contents(content)
+        page.compress_content_streams()
+    return removed
+
+
+# --- BUILDING ---
+def _remove_widget(acroform, widget_ref):
+    """Unlinks a widget from the field tree, and any field left without widgets."""
+    node_ref = widget_ref
+    while True:
+        node = node_ref.get_object()
+        parent_ref = node.raw_get("/Parent") if "/Parent" in node else None
+        siblings = parent_ref.get_object()["/Kids"] if parent_ref is not None else acroform.get("/Fields", [])
+        siblings[:] = [ref for ref in siblings if getattr(ref, "idnum", None) != node_ref.idnum]
+        if parent_ref is None or len(siblings):
+            return
+        node_ref = parent_ref
+
+
+def build_lean_template(template_path, out_path, drop_pages=(), strip=True):
+    writer = PdfWriter(clone_from=PdfReader(template_path))
+    acroform = writer.root_object.get("/AcroForm")
+    for index in sorted(set(drop_pages), reverse=True):
+        if index < len(writer.pages):
+            if acroform is not None:
+                for annot_ref in writer.pages[index].get("/Annots", []):
+                    if isinstance(annot_ref, IndirectObject) and annot_ref.get_object().get("/Subtype") == "/Widget":
+                        _remove_widget(acroform, annot_ref)
+            del writer.pages[index]
+
+    if strip:
+        hidden = hidden_layers(writer.root_object)
+        for page in writer.pages:
+            for key in UNSHOWN_PAGE_KEYS:
+                if key in page:
+                    del page[NameObject(key)]
+            strip_hidden_content(page, writer, hidden)
+
+    # Removed objects are still numbered in the writer; both rewrites below
+    # copy only what the catalog still reaches
+    first_pass = io.BytesIO()
+    writer.write(first_pass)
+
+    # Write next to the destination and rename, so a worker never reads half a file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if pikepdf is not None:
+                with pikepdf.open(first_pass) as pdf:
+                    pdf.save(f, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+            else:
+                PdfWriter(clone_from=PdfReader(first_pass)).write(f)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return out_path
+
+
+@lru_cache(maxsize=64)
+def _lean_template(path, mtime, size, drop_pages, strip):
+    key = hashlib.sha256(f"{LEAN_VERSION}|{path}|{mtime}|{size}|{drop_pages}|{strip}".encode()).hexdigest()[:16]
+    return os.path.join(LEAN_TEMPLATE_FOLDER, f"{os.path.splitext(os.path.basename(path))[0]}-{key}.pdf")
+
+
+def lean_template(template_path, drop_pages=(), strip=True):
+    """Path of the lean copy of template_path, with drop_pages already removed.
+
+    strip=False only removes the dropped pages (and their fields); everything
+    else the template shows or carries is kept.
+    """
+    stat = os.stat(template_path)
+    drop_pages = tuple(sorted(set(drop_pages)))
+    out_path = _lean_template(os.path.abspath(template_path), stat.st_mtime, stat.st_size, drop_pages, strip)
+    # Checked on every call, not only when the name is first worked out: a
+    # /tmp cleaner or another deploy may have removed the copy since
+    if not os.path.exists(out_path):
+        os.makedirs(LEAN_TEMPLATE_FOLDER, exist_ok=True)
+        build_lean_template(template_path, out_path, drop_pages, strip)
+    return out_path
@@ -0,0 +1,173 @@
+"""PDF engines behind save_filled_pdf's full-rewrite output.
+
+A backend loads a template into a document it can edit, then performs the
+steps a batch needs:
+
+    load(template_path)        -> doc
+    drop_pages(doc, indexes)
+    set_fields(doc, data_map)
+    set_need_appearances(doc)
+    copy_layers(doc)           keep /OCProperties so hidden layers stay hidden
+    save(doc, out_path)
+
+fill_pdf runs them in that order. PDF_BACKEND (env) picks the engine:
+
+    pypdf    default; the template is appended into a fresh PdfWriter and the
+             fields get pypdf's generated appearance streams
+    pikepdf  qpdf (C++) edits a copy of the template in place. Field matching
+             is the same as pypdf's (incremental_writer.matching_widgets); like
+             the incremental writer, text fields get their blank appearance
+             removed and are drawn by the viewer from /V (NeedAppearances).
+             Needs `pip install pikepdf`.
+
+The incremental output mode (PDF_OUTPUT_MODE=incremental) does not go through
+a backend.
+
+drop_pages only unlinks pages from the page tree; their widgets keep them in
+the file. save_filled_pdf therefore never passes it, and fills a template copy
+without those pages and their fields instead (lean_templates.py).
+"""
+import os
+
+from pypdf import PdfWriter
+from pypdf.generic import BooleanObject, DictionaryObject, NameObject
+
+from incremental_writer import load_template, matching_widgets
+
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pypdf")
+
+
+# --- PYPDF ---
+class PypdfBackend:
+    name = "pypdf"
+
+    def load(self, template_path):
+        # The parsed template is cached per process (and shared across gunicorn
+        # workers when preloaded); append() copies what it needs into the writer.
+        template = load_template(template_path)
+        writer = PdfWriter()
+        with template.lock:
+            writer.append(template.reader)
+        return template, writer
+
+    def drop_pages(self, doc, indexes):
+        _, writer = doc
+        for index in sorted(indexes, reverse=True):
+            if index < len(writer.pages):
+                del writer.pages[index]
+
+    def set_fields(self, doc, data_map):
+        _, writer = doc
+        for page in writer.pages:
+            writer.update_page_form_field_values(page, data_map)
+
+    def set_need_appearances(self, doc):
+        _, writer = doc
+        if "/AcroForm" not in writer.root_object:
+            writer.root_object.update({
+                NameObject("/AcroForm"): DictionaryObject()
+            })
+        writer.root_object["/AcroForm"][NameObject("/NeedAppearances")] = BooleanObject(True)
+
+    def copy_layers(self, doc):
+        # append() copies pages, not the catalog, so the layer settings are cloned across
+        template, writer = doc
+        reader = template.reader
+        if "/OCProperties" in reader.root_object:
+            with template.lock:
+                writer.root_object[NameObject("/OCProperties")] = \
+                    reader.root_object["/OCProperties"].clone(writer)
+
+    def save(self, doc, out_path):
+        _, writer = doc
+        with open(out_path, "wb") as f:
+            writer.write(f)
+
+
+# --- PIKEPDF ---
+class PikepdfBackend:
+    name = "pikepdf"
+
+    def __init__(self):
+        import pikepdf
+        self.pikepdf = pikepdf
+
+    def load(self, template_path):
+        # qpdf parses lazily; the widget index comes from the cached pypdf template,
+        # whose object numbers are the same since both read the same file
+        template = load_template(template_path)
+        return template, self.pikepdf.open(template_path), set(range(len(template.widgets)))
+
+    def drop_pages(self, doc, indexes):
+        _, pdf, kept_pages = doc
+        for index in sorted(indexes, reverse=True):
+            if index < len(pdf.pages):
+                del pdf.pages[index]
+                kept_pages.discard(index)
+
+    def set_fields(self, doc, data_map):
+        template, pdf, kept_pages = doc
+        Name, String = self.pikepdf.Name, self.pikepdf.String
+        for widget_ref, field_ref, _, field_type, value in matching_widgets(template, data_map, sorted(kept_pages)):
+            field = pdf.get_object((field_ref.idnum, field_ref.generation))
+            widget = pdf.get_object((widget_ref.idnum, widget_ref.generation))
+            if field_type == "/Btn":
+                field.V = Name(value) if value.startswith("/") else String(value)
+                states = widget.get("/AP", {}).get("/N", {})
+                widget.AS = Name(value if value.startswith("/") and value in states else "/Off")
+            else:
+                field.V = String(value)
+                if field_type in ("/Tx", "/Ch") and "/AP" in widget:
+                    del widget.AP
+        # Without /AP the viewer has to build the appearances, on every form
+        self.set_need_appearances(doc)
+
+    def set_need_appearances(self, doc):
+        _, pdf, _ = doc
+        if "/AcroForm" not in pdf.Root:
+            pdf.Root.AcroForm = pdf.make_indirect(self.pikepdf.Dictionary())
+        pdf.Root.AcroForm.NeedAppearances = True
+
+    def copy_layers(self, doc):
+        pass  # the template's own catalog, /OCProperties included, is edited in place
+
+    def save(self, doc, out_path):
+        _, pdf, _ = doc
+        with pdf:
+            pdf.save(out_path, object_stream_mode=self.pikepdf.ObjectStreamMode.preserve)
+
+
+BACKENDS = {"pypdf": PypdfBackend, "pikepdf": PikepdfBackend}
+_instances = {}
+
+
+def get_backend(name=None):
+    name = name or PDF_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF_BACKEND '{name}'. Use one of: {', '.join(BACKENDS)}.")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def fill_pdf(backend, template_path, data_map, out_path, copy_layers=False, drop_pages=()):
+    doc = backend.load(template_path)
+    backend.drop_pages(doc, drop_pages)
+
+    # Apply to all pages
+    backend.set_fields(doc, data_map)
+
+    if copy_layers:
+        # =========================================================
+        # CRITICAL FIX 1: Fix "Floating Text" / Font Issues
+        # Forces viewer to regenerate field appearance using native fonts
+        # =========================================================
+        backend.set_need_appearances(doc)
+
+        # =========================================================
+        # CRITICAL FIX 2: Fix "French text on top of English"
+        # Copies Layer settings to ensure hidden layers stay hidden
+        # =========================================================
+        backend.copy_layers(doc)
+
+    backend.save(doc, out_path)
@@ -0,0 +1,121 @@
+"""On-demand profiling of a single generation request.
+
+Off unless PROFILE_SECRET is set. A request then asks for a profile with
+
+    X-Profile: cprofile | sampling        (or ?profile=...)
+    X-Profile-Token: <PROFILE_SECRET>     (header only, so it stays out of access logs)
+
+and the profile files are added to the returned ZIP:
+
+    cprofile  -> profile.pstats (load with pstats / snakeviz) + profile.txt summary
+    sampling  -> profile.collapsed (folded stacks for flamegraph.pl / speedscope)
+
+Requests without the flag go straight through; nothing here runs for them.
+"""
+import collections
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import zipfile
+
+PROFILE_SECRET = os.environ.get("PROFILE_SECRET", "")
+SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+class ProfileNotAllowed(Exception):
+    pass
+
+
+def requested_profile_mode(headers, args):
+    """Returns the profile mode asked for, None if none was, or raises ProfileNotAllowed."""
+    mode = headers.get("X-Profile") or args.get("profile")
+    if not mode:
+        return None
+    token = headers.get("X-Profile-Token") or ""
+    if not PROFILE_SECRET or not hmac.compare_digest(token.encode(), PROFILE_SECRET.encode()):
+        raise ProfileNotAllowed("Profiling is not enabled or the token is wrong.")
+    mode = mode.lower()
+    if mode not in PROFILE_MODES:
+        raise ProfileNotAllowed(f"Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}.")
+    return mode
+
+
+# --- CPROFILE ---
+def _run_cprofile(out_folder, func, args):
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+
+    stats_path = os.path.join(out_folder, "profile.pstats")
+    profiler.dump_stats(stats_path)
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+    summary_path = os.path.join(out_folder, "profile.txt")
+    with open(summary_path, "w") as f:
+        f.write(summary.getvalue())
+    return result, [stats_path, summary_path]
+
+
+# --- SAMPLING ---
+# A background thread snapshots the calling thread's stack every
+# SAMPLE_INTERVAL seconds and counts identical stacks, which gives the
+# "folded" format flame graph tools read: "outer;inner;leaf <count>".
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _sample(thread_id, stop, counts):
+    while not stop.wait(SAMPLE_INTERVAL):
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        if stack:
+            counts[";".join(reversed(stack))] += 1
+
+
+def _run_sampling(out_folder, func, args):
+    counts = collections.Counter()
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample, args=(threading.get_ident(), stop, counts), daemon=True)
+    sampler.start()
+    try:
+        result = func(*args)
+    finally:
+        stop.set()
+        sampler.join()
+
+    collapsed_path = os.path.join(out_folder, "profile.collapsed")
+    with open(collapsed_path, "w") as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+    return result, [collapsed_path]
+
+
+def run_profiled(mode, out_folder, func, *args):
+    """Runs func(*args) under the given profiler; returns (result, profile file paths)."""
+    if mode == "cprofile":
+        return _run_cprofile(out_folder, func, args)
+    return _run_sampling(out_folder, func, args)
+
+
+def add_to_zip(zip_path, paths):
+    with zipfile.ZipFile(zip_path, "a") as zipf:
+        for path in paths:
+            zipf.write(path, os.path.basename(path))
+
+
+def generate_profiled(mode, work_folder, func, *args):
+    """run_profiled + add_to_zip for callers whose func returns a result with a zip_path."""
+    profile_folder = os.path.join(work_folder, "profile")
+    os.makedirs(profile_folder, exist_ok=True)
+    result, profile_files = run_profiled(mode, profile_folder, func, *args)
+    add_to_zip(result.zip_path, profile_files)
+    return result
@@ -0,0 +1,153 @@
+"""Roster ingestion: CSV, XLSX or Parquet, optionally gzip-compressed.
+
+Registration exports carry 40+ columns, but the processors only read the
+ones in ROSTER_COLUMNS. Those are chosen at read time, so the other columns
+are never parsed or turned into Python strings. The format is sniffed from
+the first bytes rather than the file name:
+
+    1f 8b         gzip (decompressed, then sniffed again)
+    PK 03 04      XLSX (first sheet)
+    PAR1          Parquet
+    anything else CSV
+
+Columns missing from the upload are left out rather than added blank, so the
+processors' row.get(...) defaults (e.g. Province "ON") still apply.
+
+CSV text is UTF-8, or else Windows-1252 (what Excel on Windows saves as plain
+"CSV", accented names included); anything that is neither is a RosterError.
+
+The upload page parses CSV rosters in the browser first and sends only the
+ROSTER_COLUMNS, gzip-compressed (templates/index.html). That arrives here as
+an ordinary gzipped CSV whose every column is wanted.
+"""
+import gzip
+import io
+import os
+
+import pandas as pd
+from pandas.io.parsers.readers import STR_NA_VALUES
+
+from admission import AdmissionRejected, MAX_ROSTER_BYTES
+
+ROSTER_COLUMNS = (
+    "AttendeeName", "Street", "City", "PostalCode", "Province",
+    "E-mail", "AttendeePhone", "DateOfBirth",
+)
+
+# Fastest installed readers: pyarrow's multithreaded CSV parser over pandas'
+# C parser, and the Rust calamine XLSX reader over openpyxl (about 10x). Both
+# are optional (requirements-fast.txt); Parquet needs pyarrow.
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    pa = pa_csv = None
+    CSV_ENGINE = "c"
+
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+
+class RosterError(ValueError):
+    pass
+
+
+def _gunzip(data):
+    # The upload limit applies to the compressed bytes, so bound the output too
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+        out = f.read(MAX_ROSTER_BYTES + 1) if MAX_ROSTER_BYTES else f.read()
+    if MAX_ROSTER_BYTES and len(out) > MAX_ROSTER_BYTES:
+        raise AdmissionRejected(
+            f"Roster too large once decompressed: limit is {MAX_ROSTER_BYTES / (1024 * 1024):g} MB.", 413)
+    return out
+
+
+def _wanted(columns):
+    wanted = [c for c in columns if c in ROSTER_COLUMNS]
+    if not wanted:
+        raise RosterError(f"No roster columns found. Expected some of: {', '.join(ROSTER_COLUMNS)}.")
+    return wanted
+
+
+def _as_text(df):
+    # Typed Parquet/XLSX columns (numbers, timestamps) become the strings a CSV would hold
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            df[col] = values.astype("Int64")  # 9055550000, not 9055550000.0
+    return df.astype("string").fillna("").astype(object)
+
+
+def _as_utf8(data):
+    try:
+        data.decode("utf-8")
+        return data
+    except UnicodeDecodeError:
+        pass
+    try:
+        return data.decode("cp1252").encode("utf-8")
+    except UnicodeDecodeError:
+        raise RosterError("Could not read the roster's text. Save it as CSV UTF-8 and upload it again.")
+
+
+def _read_csv(data):
+    data = _as_utf8(data)
+    wanted = _wanted(pd.read_csv(io.BytesIO(data), nrows=0).columns)
+    if CSV_ENGINE == "c":
+        return pd.read_csv(io.BytesIO(data), dtype=str, usecols=wanted).fillna("")
+
+    # pyarrow.csv directly rather than pandas' engine="pyarrow": that one infers
+    # column types before applying dtype, so phone numbers lose leading zeros and
+    # gain ".0". Every wanted column is read as text, with pandas' blank markers.
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=wanted,
+            column_types={c: pa.string() for c in wanted},
+            null_values=sorted(STR_NA_VALUES),
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas().fillna("").astype(object)
+
+
+def _read_xlsx(data):
+    # A callable usecols skips the other columns without loading the workbook twice
+    df = pd.read_excel(io.BytesIO(data), dtype=str, usecols=lambda c: c in ROSTER_COLUMNS, engine=EXCEL_ENGINE)
+    _wanted(df.columns)
+    return _as_text(df)
+
+
+def _read_parquet(data):
+    if pa is None:
+        raise RosterError("Parquet rosters need pyarrow on the server (requirements-fast.txt). Upload CSV or XLSX.")
+    import pyarrow.parquet as pq
+    source = io.BytesIO(data)
+    columns = _wanted(pq.ParquetFile(source).schema_arrow.names)
+    df = _as_text(pd.read_parquet(source, columns=columns))
+    # Blank the same placeholder strings ("NA", "N/A", "null", ...) the CSV and XLSX readers do
+    return df.mask(df.isin(STR_NA_VALUES), "")
+
+
+def read_roster(source):
+    """Reads a roster upload (path or binary file object) into a DataFrame of strings."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source.read()
+
+    if data[:2] == b"\x1f\x8b":
+        data = _gunzip(data)
+
+    if data[:4] == b"PK\x03\x04":
+        df = _read_xlsx(data)
+    elif data[:4] == b"PAR1":
+        df = _read_parquet(data)
+    else:
+        df = _read_csv(data)
+    return df.fillna("")
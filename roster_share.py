@@ -0,0 +1,119 @@
+"""Hands a normalized roster to worker processes without pickling it.
+
+pack_roster(df) writes the roster once, as an Arrow IPC stream, into a
+multiprocessing shared-memory block and returns a PackedRoster. Its `handle`
+(block name and length) is all a task needs to carry. In the worker,
+attach_roster(handle) maps the block and reads the Arrow table straight out
+of it, without a copy. The attachment is kept for the process's later
+batches. rows(start, stop) converts only that row range into the usual
+DataFrame of strings, so a worker never pays for the whole roster.
+
+    with pack_roster(df) as packed:
+        pool.map(render_rows, [(packed.handle, start, stop) for start, stop in ranges])
+
+    def render_rows(handle, start, stop):
+        df = attach_roster(handle).rows(start, stop)
+
+The ASGI front (asgi.py) hands each job's checked roster to its process pool
+this way: the worker copies it out with read_packed(handle) and keeps nothing
+mapped, and the request unlinks the block once the job is done.
+
+Attach from the owner's own worker processes (fork or spawn). They share its
+resource tracker, so only the owner unlinks the block, on leaving the `with`.
+benchmarks/bench_roster_handoff.py measures the per-batch cost against
+pickling df.iloc slices. Needs pyarrow (requirements-fast.txt); check
+SHARED_ROSTER_SUPPORTED and pickle the DataFrame without it.
+"""
+from collections import OrderedDict, namedtuple
+from multiprocessing import shared_memory
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+SHARED_ROSTER_SUPPORTED = pa is not None
+
+RosterHandle = namedtuple("RosterHandle", "name size rows")
+MAX_ATTACHED = 4  # rosters a worker keeps mapped at once (one per in-flight job)
+
+_attached = OrderedDict()
+
+
+class PackedRoster:
+    """Owner side: the shared block. Unlinked on close()."""
+    def __init__(self, shm, size, rows):
+        self.shm = shm
+        self.handle = RosterHandle(shm.name, size, rows)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedRoster:
+    """Worker side: the Arrow table, read in place from the shared block."""
+    def __init__(self, handle):
+        self.shm = shared_memory.SharedMemory(name=handle.name)
+        self.table = pa.ipc.open_stream(pa.py_buffer(self.shm.buf[:handle.size])).read_all()
+
+    def rows(self, start, stop):
+        """Rows [start, stop) as a DataFrame of strings, like roster_io.read_roster returns."""
+        # to_pydict builds the Python strings directly; to_pandas costs more than that on a few rows
+        return pd.DataFrame(self.table.slice(start, stop - start).to_pydict(), dtype=object)
+
+    def close(self):
+        # The table's buffers point into the block, so they have to go first
+        self.table = None
+        self.shm.close()
+
+
+def pack_roster(df):
+    table = pa.Table.from_pandas(df.fillna("").astype(str), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    data = sink.getvalue()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, data.size))
+    try:
+        shm.buf[:data.size] = memoryview(data).cast("B")
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return PackedRoster(shm, data.size, table.num_rows)
+
+
+def attach_roster(handle):
+    """The roster behind handle, mapped once per process and reused by later batches."""
+    roster = _attached.get(handle.name)
+    if roster is None:
+        if len(_attached) >= MAX_ATTACHED:
+            _attached.popitem(last=False)[1].close()
+        roster = _attached[handle.name] = SharedRoster(handle)
+    _attached.move_to_end(handle.name)
+    return roster
+
+
+def read_packed(handle):
+    """The whole roster behind handle, copied out; nothing stays mapped afterwards."""
+    roster = SharedRoster(handle)
+    try:
+        return roster.rows(0, handle.rows)
+    finally:
+        roster.close()
+
+
+def detach_all():
+    """Closes this process's attachments (the owner still has to unlink its blocks)."""
+    while _attached:
+        _attached.popitem()[1].close()
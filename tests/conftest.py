@@ -0,0 +1,144 @@
+import os
+import shutil
+import sys
+import time
+
+import pandas as pd
+import pytest
+from pypdf import PdfReader
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app as flask_app  # noqa: E402
+import archive_store  # noqa: E402
+import asgi  # noqa: E402
+import form_logic  # noqa: E402
+import lean_templates  # noqa: E402
+import pdf_backends  # noqa: E402
+from admission import SharedJobGate  # noqa: E402
+from app import FORM_CONFIG, TEMPLATE_FOLDER  # noqa: E402
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+ROSTER_SIZE = 30  # enough to reach every processor's continuation sheets
+
+FIRST_NAMES = ["Kian", "Evan", "Maya", "Li", "Priya", "Noah", "Zoe", "Omar", "Ava", "Jun"]
+LAST_NAMES = ["Ahadi", "Fung", "Singh", "Chen", "Patel", "Smith", "Tremblay", "Haddad", "Nguyen", "Park"]
+DOB_FORMATS = [
+    lambda d, m, y: f"{d:02d}/{m:02d}/{y}",   # DD/MM/YYYY
+    lambda d, m, y: f"{y}-{m:02d}-{d:02d}",   # YYYY-MM-DD
+    lambda d, m, y: f"{d}/{m}/{y}",           # D/M/YYYY
+    lambda d, m, y: f"{d:02d}/{m:02d}/{y % 100:02d}",  # 2-digit year (pandas fallback)
+]
+
+
+def make_roster(n=ROSTER_SIZE):
+    """Deterministic roster shaped like a registration-system export."""
+    rows = []
+    for i in range(n):
+        first, last = FIRST_NAMES[i % 10], LAST_NAMES[(i * 3) % 10]
+        if i % 7 == 3:
+            name = f"{first} {last}"       # no comma
+        elif i % 11 == 5:
+            name = last                   # single word
+        else:
+            name = f"{last} , {first}"    # "Last , First" like the real export
+        dob = "" if i % 13 == 12 else DOB_FORMATS[i % 4]((i % 28) + 1, (i % 12) + 1, 1990 + i % 20)
+        rows.append({
+            "CalendarName": "Test Course",
+            "AttendeeName": name,
+            "AttendeePhone": f"(905) 555-{i:04d}",
+            "DateOfBirth": dob,
+            "E-mail": f"candidate{i}@example.com",
+            "Street": f"{i + 1} Main Street",
+            "City": "Markham" if i % 2 else "Thornhill",
+            "Province": "ON" if i % 5 else "",
+            "PostalCode": f"L3P {i % 10}M{i % 7}",
+        })
+    return pd.DataFrame(rows, dtype=str).fillna("")
+
+
+def read_filled_values(pdf_path):
+    """Field name -> value for every field with a non-empty value."""
+    fields = PdfReader(pdf_path).get_fields() or {}
+    values = {}
+    for name, field in fields.items():
+        value = field.get("/V")
+        if value not in (None, ""):
+            values[name] = str(value)
+    return dict(sorted(values.items()))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def output_folders(tmp_path_factory):
+    """Keeps work folders, archives, lean copies and gate files out of /tmp/outputs."""
+    root = tmp_path_factory.mktemp("outputs")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(flask_app, "UPLOAD_FOLDER", str(root))
+        mp.setattr(asgi, "UPLOAD_FOLDER", str(root))
+        mp.setattr(archive_store, "ARCHIVE_FOLDER", str(root / "archives"))
+        mp.setattr(lean_templates, "LEAN_TEMPLATE_FOLDER", str(root / "lean_templates"))
+        if isinstance(flask_app.job_gate, SharedJobGate):
+            mp.setattr(flask_app.job_gate, "folder", str(root / "job_gate"))
+        lean_templates._lean_template.cache_clear()
+        yield root
+    lean_templates._lean_template.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def roster():
+    return make_roster()
+
+
+def warm_lean_copies(batches, template_path):
+    # Builds the template copies save_filled_pdf fills, so timings leave out their one-off build
+    for batch in batches:
+        if form_logic.PDF_STRIP_UNUSED or batch["drop_pages"]:
+            lean_templates.lean_template(template_path, batch["drop_pages"], strip=form_logic.PDF_STRIP_UNUSED)
+
+
+def run_every_form(roster, folder_factory, label):
+    runs = {}
+    for form_type, config in FORM_CONFIG.items():
+        out_folder = str(folder_factory.mktemp(f"{label}_{form_type}"))
+        template_path = os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"])
+        warm_lean_copies(config["plan"](roster.copy()), template_path)
+        start = time.perf_counter()
+        outputs = config["func"](roster.copy(), template_path, out_folder)
+        elapsed = time.perf_counter() - start
+        runs[form_type] = {"outputs": outputs, "elapsed": elapsed}
+    return runs
+
+
+# Output settings the processors are run under, as (module, attribute, value)
+# overrides; each also gets its own temporary LEAN_TEMPLATE_FOLDER
+OUTPUT_SETTINGS = {
+    "full": (),
+    "incremental": ((form_logic, "PDF_OUTPUT_MODE", "incremental"),),
+    "pikepdf": ((pdf_backends, "PDF_BACKEND", "pikepdf"),),
+    "lean": ((form_logic, "PDF_STRIP_UNUSED", True),),
+}
+
+
+@pytest.fixture(scope="session", params=list(OUTPUT_SETTINGS))
+def output_runs(request, roster, tmp_path_factory):
+    """Runs each FORM_CONFIG processor once under one of OUTPUT_SETTINGS.
+
+    Shared by the golden, backend and throughput tests; pick a setting with
+    @pytest.mark.parametrize("output_runs", [...], indirect=True).
+    """
+    setting = request.param
+    if setting == "pikepdf":
+        pytest.importorskip("pikepdf")
+    with pytest.MonkeyPatch.context() as mp:
+        for module, name, value in OUTPUT_SETTINGS[setting]:
+            mp.setattr(module, name, value)
+        mp.setattr(lean_templates, "LEAN_TEMPLATE_FOLDER", str(tmp_path_factory.mktemp(f"lean_{setting}")))
+        lean_templates._lean_template.cache_clear()
+        try:
+            runs = run_every_form(roster, tmp_path_factory, setting)
+        finally:
+            lean_templates._lean_template.cache_clear()
+    yield runs
+    for run in runs.values():
+        shutil.rmtree(os.path.dirname(run["outputs"][0]), ignore_errors=True)
@@ -0,0 +1,200 @@
+"""Admission control: the concurrency gates, the per-job budgets and the endpoints' rejections."""
+import asyncio
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from starlette.testclient import TestClient
+
+import admission
+import app as flask_app
+import asgi
+from admission import AdmissionRejected, AsyncJobGate, JobGate, SharedJobGate, run_with_budget
+from app import app
+from conftest import make_roster
+
+
+@pytest.fixture(params=["thread", "shared"])
+def make_gate(request, tmp_path):
+    if request.param == "shared":
+        pytest.importorskip("fcntl")
+        return lambda **limits: SharedJobGate(str(tmp_path / "gate"), **limits)
+    return lambda **limits: JobGate(**limits)
+
+
+def busy(gate):
+    with pytest.raises(AdmissionRejected) as excinfo:
+        with gate:
+            pass
+    return excinfo.value
+
+
+def test_gate_refuses_when_queue_is_full(make_gate):
+    gate = make_gate(max_active=1, max_waiting=0, timeout=5)
+    with gate:
+        start = time.monotonic()
+        assert busy(gate).status == 429
+        assert time.monotonic() - start < 1  # turned away, not queued
+
+
+def test_gate_gives_up_after_queue_timeout(make_gate):
+    gate = make_gate(max_active=1, max_waiting=1, timeout=0.2)
+    with gate:
+        start = time.monotonic()
+        assert busy(gate).status == 429
+        assert time.monotonic() - start >= 0.2
+
+
+def test_gate_admits_once_a_slot_frees(make_gate):
+    gate = make_gate(max_active=1, max_waiting=1, timeout=5)
+    entered = threading.Event()
+
+    def hold():
+        with gate:
+            entered.set()
+            time.sleep(0.2)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait()
+    with gate:
+        pass
+    holder.join()
+
+
+def _hold_slot(folder, entered, release):
+    with SharedJobGate(folder, max_active=1, max_waiting=0, timeout=0):
+        entered.set()
+        release.wait(10)
+
+
+def test_shared_gate_counts_other_processes(tmp_path):
+    # What gunicorn's sync workers need: a slot taken in one process is taken in all
+    pytest.importorskip("fcntl")
+    folder = str(tmp_path / "gate")
+    entered, release = multiprocessing.Event(), multiprocessing.Event()
+    worker = multiprocessing.Process(target=_hold_slot, args=(folder, entered, release))
+    worker.start()
+    try:
+        assert entered.wait(10)
+        assert busy(SharedJobGate(folder, max_active=1, max_waiting=0, timeout=0)).status == 429
+    finally:
+        release.set()
+        worker.join()
+    with SharedJobGate(folder, max_active=1, max_waiting=0, timeout=0):
+        pass
+
+
+def test_async_gate_queue_and_timeout():
+    async def scenario():
+        full = AsyncJobGate(max_active=1, max_waiting=0, timeout=5)
+        slow = AsyncJobGate(max_active=1, max_waiting=1, timeout=0.2)
+        results = []
+        for gate in (full, slow):
+            async with gate:
+                with pytest.raises(AdmissionRejected) as excinfo:
+                    async with gate:
+                        pass
+                results.append(excinfo.value.status)
+        return results
+
+    assert asyncio.run(scenario()) == [429, 429]
+
+
+# --- BUDGETS ---
+def spin(seconds):
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        pass
+    return "done"
+
+
+def grow(megabytes):
+    held = bytearray(megabytes * 1024 * 1024)
+    held[::4096] = b"x" * len(held[::4096])  # touch every page so it is resident
+    time.sleep(1)
+    return len(held)
+
+
+def test_cpu_budget_returns_413(monkeypatch):
+    if not admission.CPU_BUDGET_SUPPORTED:
+        pytest.skip("no RLIMIT_CPU here")
+    monkeypatch.setattr(admission, "JOB_CPU_SECONDS", 1)
+    monkeypatch.setattr(admission, "JOB_MEMORY_MB", 0)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        run_with_budget(spin, 5)
+    assert excinfo.value.status == 413
+    assert "CPU" in str(excinfo.value)
+    assert run_with_budget(spin, 0.1) == "done"  # the next job gets a fresh budget
+
+
+def test_memory_budget_returns_413(monkeypatch):
+    if not admission.MEMORY_BUDGET_SUPPORTED:
+        pytest.skip("no /proc/self/statm here")
+    monkeypatch.setattr(admission, "JOB_CPU_SECONDS", 0)
+    monkeypatch.setattr(admission, "JOB_MEMORY_MB", 50)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        run_with_budget(grow, 200)
+    assert excinfo.value.status == 413
+    assert "MB" in str(excinfo.value)
+
+
+def test_budgets_are_skipped_where_unsupported(monkeypatch):
+    monkeypatch.setattr(admission, "CPU_BUDGET_SUPPORTED", False)
+    monkeypatch.setattr(admission, "MEMORY_BUDGET_SUPPORTED", False)
+    monkeypatch.setattr(admission, "JOB_MEMORY_MB", 1)
+    assert run_with_budget(grow, 20) == 20 * 1024 * 1024
+
+
+# --- ENDPOINTS ---
+@pytest.fixture(params=["flask", "asgi"])
+def client(request):
+    # No lifespan for the ASGI client: everything here is refused before the pool
+    return app.test_client() if request.param == "flask" else TestClient(asgi.app)
+
+
+def post_roster(client, rows=3):
+    csv_bytes = make_roster(rows).to_csv(index=False).encode()
+    if isinstance(client, TestClient):
+        return client.post("/", data={"form_type": "efa"}, files={"csv_file": ("roster.csv", csv_bytes, "text/csv")})
+    return client.post("/", data={"form_type": "efa", "csv_file": (io.BytesIO(csv_bytes), "roster.csv")})
+
+
+def test_full_gate_returns_429_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(flask_app, "job_gate", JobGate(max_active=0, max_waiting=0))
+    monkeypatch.setattr(asgi, "job_gate", AsyncJobGate(max_active=0, max_waiting=0))
+    response = post_roster(client)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+
+
+class UnusedGate:
+    def __enter__(self):
+        raise AssertionError("queued for a slot")
+
+    async def __aenter__(self):
+        raise AssertionError("queued for a slot")
+
+
+def test_oversized_roster_is_refused_before_queueing(client, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_CANDIDATES", 2)
+    monkeypatch.setattr(flask_app, "job_gate", UnusedGate())
+    monkeypatch.setattr(asgi, "job_gate", UnusedGate())
+    assert post_roster(client).status_code == 413
+
+
+class BrokenExecutor:
+    def submit(self, *args):
+        raise BrokenProcessPool("a worker died")
+
+
+def test_failed_job_removes_its_work_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(asgi, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(asgi, "executor", BrokenExecutor())
+    response = post_roster(TestClient(asgi.app, raise_server_exceptions=False))
+    assert response.status_code == 500
+    assert os.listdir(tmp_path) == []
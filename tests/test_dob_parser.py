@@ -0,0 +1,19 @@
+"""dob_parser.parse_dob must read every roster layout as the right calendar date."""
+import datetime
+
+import pytest
+
+from dob_parser import parse_dob
+
+
+@pytest.mark.parametrize("text", [
+    "2007-01-03", "2007/01/03", "2007.01.03", "2007/1/3", "2007-01-03 00:00:00",  # year first: never swapped
+    "03/01/2007", "3/1/2007", "03-01-2007", "03.01.2007",                        # day first
+])
+def test_3_january_2007(text):
+    assert parse_dob(text) == datetime.date(2007, 1, 3)
+
+
+@pytest.mark.parametrize("text", ["", "   ", None, "not a date", "2007/13/45"])
+def test_unreadable_is_none(text):
+    assert parse_dob(text) is None
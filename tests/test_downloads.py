@@ -0,0 +1,151 @@
+"""Resumable /download/<id> links: ETag, conditional GET, Range and store pruning, on both fronts."""
+import io
+import os
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+import app as flask_app
+import archive_store
+import asgi
+from app import app
+from archive_store import archive_path, prune_archives, store_archive
+from conftest import make_roster
+
+PAYLOAD = bytes(range(256)) * 64  # 16 KB stand-in for a generated ZIP
+
+
+@pytest.fixture(autouse=True)
+def archive_folder(tmp_path, monkeypatch):
+    folder = tmp_path / "archives"
+    monkeypatch.setattr(archive_store, "ARCHIVE_FOLDER", str(folder))
+    return folder
+
+
+def make_zip(tmp_path, name="Filled_Forms.zip", payload=PAYLOAD):
+    path = tmp_path / name
+    path.write_bytes(payload)
+    return str(path)
+
+
+def body(response):
+    return response.content if hasattr(response, "content") else response.data
+
+
+@pytest.fixture(params=["flask", "asgi"])
+def client(request):
+    # No lifespan for the ASGI client: downloads don't need the process pool
+    return app.test_client() if request.param == "flask" else TestClient(asgi.app)
+
+
+def test_full_download_has_strong_etag(client, tmp_path):
+    archive_id = store_archive(make_zip(tmp_path))
+    response = client.get(f"/download/{archive_id}")
+    assert response.status_code == 200
+    assert body(response) == PAYLOAD
+    assert response.headers["ETag"] == f'"{archive_id}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert "private" in response.headers["Cache-Control"]
+
+
+def test_conditional_get(client, tmp_path):
+    archive_id = store_archive(make_zip(tmp_path))
+    first = client.get(f"/download/{archive_id}")
+    assert client.get(f"/download/{archive_id}", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert client.get(f"/download/{archive_id}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_range_resumes_download(client, tmp_path):
+    archive_id = store_archive(make_zip(tmp_path))
+    etag = f'"{archive_id}"'
+    response = client.get(f"/download/{archive_id}", headers={"Range": "bytes=1000-", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 1000-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+    assert body(response) == PAYLOAD[1000:]
+
+    # A stale If-Range gets the whole file again, not a mismatched piece
+    response = client.get(f"/download/{archive_id}", headers={"Range": "bytes=1000-", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert body(response) == PAYLOAD
+
+    response = client.get(f"/download/{archive_id}", headers={"Range": f"bytes={len(PAYLOAD)}-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(PAYLOAD)}"
+
+
+@pytest.mark.parametrize("archive_id", ["a" * 32, "..%2F..%2Fetc%2Fpasswd", "short"])
+def test_unknown_ids_are_not_found(client, archive_id):
+    assert client.get(f"/download/{archive_id}").status_code == 404
+
+
+def test_expired_archive_is_gone(client, tmp_path, monkeypatch):
+    archive_id = store_archive(make_zip(tmp_path))
+    old = time.time() - archive_store.ARCHIVE_TTL - 1
+    path = archive_path(archive_id)
+    os.utime(path, (old, old))
+    assert client.get(f"/download/{archive_id}").status_code == 404
+    assert not os.path.exists(path)  # deleted, not just hidden
+
+
+def test_remove_expired_without_new_archives(tmp_path):
+    expired, live = (store_archive(make_zip(tmp_path, f"{i}.zip")) for i in range(2))
+    old = time.time() - archive_store.ARCHIVE_TTL - 1
+    os.utime(archive_store._path(expired), (old, old))
+    archive_store.remove_expired()
+    assert not os.path.exists(archive_store._path(expired))
+    assert os.path.exists(archive_store._path(live))
+
+
+def test_generate_returns_download_link(client):
+    csv_bytes = make_roster(3).to_csv(index=False).encode()
+    headers = {"Accept": "application/json"}
+    if isinstance(client, TestClient):
+        with client:  # generation needs the lifespan's process pool
+            response = client.post("/", data={"form_type": "efa"}, headers=headers,
+                                   files={"csv_file": ("roster.csv", csv_bytes, "text/csv")})
+            result = response.json()
+            download = client.get(result["download_url"])
+    else:
+        response = client.post("/", headers=headers,
+                               data={"form_type": "efa", "csv_file": (io.BytesIO(csv_bytes), "roster.csv")})
+        result = response.get_json()
+        download = client.get(result["download_url"])
+    assert response.status_code == 201
+    assert download.status_code == 200
+    assert body(download)[:2] == b"PK"
+    # 3 candidates fit on the front page, so the back page is left out
+    assert result["pages_saved"] == 1
+    assert result["bytes_saved"] > 100 * 1024  # the back page's content leaves the file
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_page_uses_links_only_with_shared_store(client, monkeypatch, shared):
+    monkeypatch.setattr(flask_app, "ARCHIVE_SHARED", shared)
+    page = body(client.get("/")).decode()
+    assert f"const DOWNLOAD_LINKS = {'true' if shared else 'false'};" in page
+
+
+def test_prune_by_ttl_count_and_bytes(tmp_path, monkeypatch):
+    ids = [store_archive(make_zip(tmp_path, f"{i}.zip")) for i in range(5)]
+    for age, archive_id in zip(range(5, 0, -1), ids):  # ids[0] oldest
+        stamp = time.time() - age
+        os.utime(archive_store._path(archive_id), (stamp, stamp))
+
+    monkeypatch.setattr(archive_store, "ARCHIVE_MAX_COUNT", 3)
+    prune_archives()
+    assert [archive_path(i) is not None for i in ids] == [False, False, True, True, True]
+
+    monkeypatch.setattr(archive_store, "ARCHIVE_MAX_BYTES", len(PAYLOAD) * 2)
+    prune_archives()
+    assert [archive_path(i) is not None for i in ids] == [False, False, False, True, True]
+
+    monkeypatch.setattr(archive_store, "ARCHIVE_TTL", 2)
+    prune_archives()
+    assert [archive_path(i) is not None for i in ids] == [False, False, False, False, True]
+
+
+def test_newest_archive_survives_its_own_prune(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_store, "ARCHIVE_MAX_BYTES", 10)  # smaller than any archive
+    archive_id = store_archive(make_zip(tmp_path))
+    assert archive_path(archive_id) is not None
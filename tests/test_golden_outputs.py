@@ -0,0 +1,48 @@
+"""Compares every processor's filled field values with the snapshots in tests/golden/.
+
+Both output modes (full rewrite and incremental update), both full-rewrite
+PDF backends (pypdf and pikepdf) and filling the lean template copies
+(PDF_STRIP_UNUSED) must match the same snapshots. Every output leaves out the
+fields that only have widgets on a batch's dropped pages.
+
+After an intended change to what gets written, refresh the snapshots with
+    UPDATE_GOLDEN=1 python -m pytest tests/test_golden_outputs.py
+and review the JSON diff like any other code change.
+"""
+import json
+import os
+
+import pytest
+
+from app import FORM_CONFIG
+from conftest import GOLDEN_DIR, read_filled_values
+
+UPDATE_GOLDEN = os.environ.get("UPDATE_GOLDEN") == "1"
+
+
+def snapshot(outputs):
+    return {os.path.basename(path): read_filled_values(path) for path in outputs}
+
+
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+def test_matches_golden(form_type, output_runs, request):
+    actual = snapshot(output_runs[form_type]["outputs"])
+    golden_path = os.path.join(GOLDEN_DIR, f"{form_type}.json")
+
+    if UPDATE_GOLDEN and request.node.callspec.params["output_runs"] == "full":
+        with open(golden_path, "w") as f:
+            json.dump(actual, f, indent=1, sort_keys=True)
+            f.write("\n")
+        pytest.skip(f"rewrote {golden_path}")
+
+    with open(golden_path) as f:
+        expected = json.load(f)
+
+    assert sorted(actual) == sorted(expected), "different set of output files"
+    for filename, fields in expected.items():
+        got = actual[filename]
+        missing = {k: v for k, v in fields.items() if k not in got}
+        changed = {k: (v, got[k]) for k, v in fields.items() if k in got and got[k] != v}
+        extra = {k: v for k, v in got.items() if k not in fields}
+        assert not (missing or changed or extra), (
+            f"{filename}: missing={missing} changed(expected, got)={changed} extra={extra}")
@@ -0,0 +1,95 @@
+"""Lean template copies (PDF_STRIP_UNUSED) must look exactly like the originals.
+
+Filled values are covered by test_golden_outputs.py (output_runs "lean"). This renders
+every kept page of the original and of the lean copy and compares pixels.
+"""
+import os
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ContentStream, DictionaryObject, NameObject
+
+import lean_templates
+from app import FORM_CONFIG, TEMPLATE_FOLDER
+from conftest import ROOT
+
+TEMPLATES = sorted({config["filename"] for config in FORM_CONFIG.values()})
+
+
+@pytest.fixture
+def lean_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(lean_templates, "LEAN_TEMPLATE_FOLDER", str(tmp_path))
+    lean_templates._lean_template.cache_clear()
+    yield tmp_path
+    lean_templates._lean_template.cache_clear()
+
+
+def render(path, drop_pages=()):
+    pdfium = pytest.importorskip("pypdfium2")
+    doc = pdfium.PdfDocument(path)
+    try:
+        return [doc[i].render(scale=1).to_pil().tobytes() for i in range(len(doc)) if i not in drop_pages]
+    finally:
+        doc.close()
+
+
+@pytest.mark.parametrize("filename", TEMPLATES)
+def test_lean_copy_renders_identically(filename, lean_folder):
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, filename)
+    lean_path = lean_templates.lean_template(template_path)
+
+    assert os.path.getsize(lean_path) < os.path.getsize(template_path)
+    for page in PdfReader(lean_path).pages:
+        assert not any(key in page for key in lean_templates.UNSHOWN_PAGE_KEYS)
+    assert render(lean_path) == render(template_path)
+
+
+def hidden_sections(path):
+    reader = PdfReader(path)
+    hidden = lean_templates.hidden_layers(reader.root_object)
+    count = 0
+    for page in reader.pages:
+        properties = page["/Resources"].get("/Properties", {})
+        tags = {name for name in properties if properties.raw_get(name).idnum in hidden}
+        content = ContentStream(page.get_contents(), reader)
+        count += sum(1 for operands, op in content.operations if op == b"BDC" and operands[1] in tags)
+    return count
+
+
+def test_hidden_layer_content_is_removed(lean_folder):
+    # Airway Management's back page carries a layer that is off by default
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, FORM_CONFIG["airway_management"]["filename"])
+    assert hidden_sections(template_path) > 0
+    assert hidden_sections(lean_templates.lean_template(template_path)) == 0
+
+
+def test_dropped_pages_leave_nothing_behind(lean_folder):
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, FORM_CONFIG["leadership_mastersheet"]["filename"])
+    full_path = lean_templates.lean_template(template_path)
+    continuation_path = lean_templates.lean_template(template_path, drop_pages=(0,))
+
+    assert len(PdfReader(continuation_path).pages) == 1
+    assert os.path.getsize(continuation_path) < os.path.getsize(full_path)
+    assert render(continuation_path) == render(template_path, drop_pages=(0,))
+
+
+def test_removed_copy_is_rebuilt(lean_folder):
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, TEMPLATES[0])
+    lean_path = lean_templates.lean_template(template_path, strip=False)
+    os.remove(lean_path)  # e.g. a /tmp cleaner, while the name is still cached
+    assert lean_templates.lean_template(template_path, strip=False) == lean_path
+    assert os.path.exists(lean_path)
+
+
+def test_inline_properties_are_left_alone():
+    # An /OC section whose properties are an inline dictionary names no layer to strip
+    template_path = os.path.join(ROOT, TEMPLATE_FOLDER, FORM_CONFIG["airway_management"]["filename"])
+    writer = PdfWriter(clone_from=PdfReader(template_path))
+    hidden = lean_templates.hidden_layers(writer.root_object)
+    page = next(p for p in writer.pages if lean_templates.strip_hidden_content(p, writer, hidden))
+    content = ContentStream(page.get_contents(), writer)
+    inline = DictionaryObject({NameObject("/Type"): NameObject("/OCMD")})
+    content.operations[:0] = [([NameObject("/OC"), inline], b"BDC"), ([], b"EMC")]
+    page.replace_contents(content)
+    assert lean_templates.strip_hidden_content(page, writer, hidden) == 0
+    assert ContentStream(page.get_contents(), writer).operations[0][1] == b"BDC"
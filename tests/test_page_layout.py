@@ -0,0 +1,80 @@
+"""Each plan emits only the template pages its candidates landed on.
+
+The plans declare their templates' slot capacity per page (PAGE_SLOTS); this
+checks the declarations against the widgets the filled values actually land
+on, for short, exactly full and overflowing rosters.
+"""
+import io
+import os
+import zipfile
+
+import pytest
+from pypdf import PdfReader
+
+import form_logic
+import lean_templates
+import pdf_backends
+from app import FORM_CONFIG, TEMPLATE_FOLDER, app
+from conftest import ROOT, make_roster
+from incremental_writer import load_template, matching_widgets
+
+
+def candidate_pages(template, batch, roster):
+    """Pages holding at least one of the batch's candidates (found by their unique e-mail)."""
+    emails = {roster.iloc[slot["candidate"] - 1]["E-mail"] for slot in batch["slots"]}
+    return {page for page in range(len(template.widgets))
+            if any(value in emails for *_, value in matching_widgets(template, batch["data_map"], [page]))}
+
+
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+@pytest.mark.parametrize("size", [1, 4, 7, 10, 14, 30])
+def test_only_pages_with_candidates_are_kept(form_type, size):
+    config = FORM_CONFIG[form_type]
+    template = load_template(os.path.join(ROOT, TEMPLATE_FOLDER, config["filename"]))
+    roster = make_roster(size)
+    for batch in config["plan"](roster.copy()):
+        kept = set(range(len(template.widgets))) - set(batch["drop_pages"])
+        assert kept == candidate_pages(template, batch, roster), batch["filename"]
+
+
+def slots(*numbers):
+    return [{"slot": n} for n in numbers]
+
+
+def test_unused_pages():
+    assert form_logic.unused_pages((6, 7), slots(1, 2, 3)) == (1,)
+    assert form_logic.unused_pages((6, 7), slots(6, 7)) == ()
+    assert form_logic.unused_pages((3, 6), slots(4, 5)) == (0,)
+
+
+@pytest.mark.parametrize("mode, backend, strip", [
+    ("full", "pypdf", False), ("full", "pikepdf", False), ("incremental", "pypdf", False), ("full", "pypdf", True),
+])
+def test_dropped_pages_leave_the_file(mode, backend, strip, tmp_path, monkeypatch):
+    if backend == "pikepdf":
+        pytest.importorskip("pikepdf")
+    monkeypatch.setattr(lean_templates, "LEAN_TEMPLATE_FOLDER", str(tmp_path / "lean"))
+    monkeypatch.setattr(form_logic, "PDF_OUTPUT_MODE", mode)
+    monkeypatch.setattr(pdf_backends, "PDF_BACKEND", backend)
+    monkeypatch.setattr(form_logic, "PDF_STRIP_UNUSED", strip)
+    lean_templates._lean_template.cache_clear()
+    monkeypatch.chdir(ROOT)
+    try:
+        response = app.test_client().post("/", data={
+            "form_type": "bronze_med",
+            "csv_file": (io.BytesIO(make_roster(17).to_csv(index=False).encode()), "roster.csv"),
+        })
+    finally:
+        lean_templates._lean_template.cache_clear()
+    assert response.status_code == 200
+
+    # 13 + 4 candidates: the second sheet is the front page alone
+    assert response.headers["X-Pages-Saved"] == "1"
+    saved = int(response.headers["X-Bytes-Saved"])
+    assert saved > 100 * 1024
+    with zipfile.ZipFile(io.BytesIO(response.data)) as zipf:
+        pages = {name: len(PdfReader(zipf.open(name)).pages) for name in zipf.namelist()}
+        sizes = {info.filename: info.file_size for info in zipf.infolist()}
+    assert pages == {"BronzeMed_Batch_1.pdf": 2, "BronzeMed_Batch_2.pdf": 1}
+    # The back page's content is gone from the file, not just unlinked from the page tree
+    assert sizes["BronzeMed_Batch_1.pdf"] - sizes["BronzeMed_Batch_2.pdf"] > saved / 2
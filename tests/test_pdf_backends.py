@@ -0,0 +1,68 @@
+"""pypdf and pikepdf backends must produce structurally equivalent files.
+
+Field values are covered by test_golden_outputs.py; this checks what the
+snapshots can't see: page count, layers, NeedAppearances and file validity.
+"""
+import os
+import shutil
+
+import pytest
+from pypdf import PdfReader
+
+from app import FORM_CONFIG, TEMPLATE_FOLDER
+from conftest import ROOT, run_every_form
+from pdf_backends import BACKENDS, get_backend
+
+
+def structure(pdf_path):
+    reader = PdfReader(pdf_path)
+    root = reader.trailer["/Root"]
+    acroform = root.get("/AcroForm", {})
+    return {
+        "pages": len(reader.pages),
+        "layers": "/OCProperties" in root,
+        "need_appearances": bool(acroform.get("/NeedAppearances", False)),
+    }
+
+
+@pytest.fixture(scope="module")
+def pypdf_outputs(roster, tmp_path_factory):
+    """Default (full rewrite, pypdf) outputs to hold the pikepdf ones against."""
+    runs = run_every_form(roster, tmp_path_factory, "pypdf")
+    yield {form_type: run["outputs"] for form_type, run in runs.items()}
+    for run in runs.values():
+        shutil.rmtree(os.path.dirname(run["outputs"][0]), ignore_errors=True)
+
+
+@pytest.mark.parametrize("output_runs", ["pikepdf"], indirect=True)
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+def test_backends_match_structurally(form_type, pypdf_outputs, output_runs):
+    pypdf_files = {os.path.basename(p): p for p in pypdf_outputs[form_type]}
+    pikepdf_files = {os.path.basename(p): p for p in output_runs[form_type]["outputs"]}
+    assert sorted(pypdf_files) == sorted(pikepdf_files)
+    template = structure(os.path.join(ROOT, TEMPLATE_FOLDER, FORM_CONFIG[form_type]["filename"]))
+
+    for name, path in pypdf_files.items():
+        expected, got = structure(path), structure(pikepdf_files[name])
+        assert got["pages"] == expected["pages"], name
+        # pypdf only carries the layers over for copy_layers forms; pikepdf edits
+        # the template itself, so it always keeps them
+        assert got["layers"] == template["layers"], name
+        assert got["layers"] or not expected["layers"], name
+        # pikepdf drops the blank text appearances, so it always asks the viewer to draw them
+        assert got["need_appearances"], name
+
+
+@pytest.mark.parametrize("output_runs", ["pikepdf"], indirect=True)
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+def test_pikepdf_output_passes_qpdf_check(form_type, output_runs):
+    pikepdf = pytest.importorskip("pikepdf")
+    for path in output_runs[form_type]["outputs"]:
+        with pikepdf.open(path) as pdf:
+            assert pdf.check_pdf_syntax() == [], path
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("no_such_engine")
+    assert "pypdf" in BACKENDS
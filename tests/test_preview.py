@@ -0,0 +1,55 @@
+"""The /preview dry run must describe exactly what generation would write, without any PDF work."""
+import io
+import json
+import os
+
+import pytest
+
+import form_logic
+from app import FORM_CONFIG, app
+from conftest import GOLDEN_DIR
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def post_preview(client, roster, form_type):
+    csv_bytes = roster.to_csv(index=False).encode()
+    return client.post("/preview", data={"form_type": form_type, "csv_file": (io.BytesIO(csv_bytes), "roster.csv")})
+
+
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+def test_preview_matches_golden(client, roster, form_type, monkeypatch):
+    def no_pdf_work(*args, **kwargs):
+        raise AssertionError("preview must not render PDFs")
+    monkeypatch.setattr(form_logic, "save_filled_pdf", no_pdf_work)
+
+    response = post_preview(client, roster, form_type)
+    assert response.status_code == 200
+    result = response.get_json()
+
+    with open(os.path.join(GOLDEN_DIR, f"{form_type}.json")) as f:
+        golden = json.load(f)
+
+    assert result["candidates"] == len(roster)
+    assert result["files"] == len(result["batches"])
+    assert sorted(b["filename"] for b in result["batches"]) == sorted(golden)
+
+    # Every candidate lands in exactly one slot, in roster order
+    numbers = [slot["candidate"] for batch in result["batches"] for slot in batch["slots"]]
+    assert numbers == list(range(1, len(roster) + 1))
+
+    # Values the rendered PDFs ended up with are the ones the preview reports
+    # (the snapshots also hold template defaults and skip dropped pages, so
+    # only the fields both know about are compared)
+    for batch in result["batches"]:
+        expected = golden[batch["filename"]]
+        changed = {k: (expected[k], v) for k, v in batch["data_map"].items() if k in expected and expected[k] != v}
+        assert not changed, f"{batch['filename']}: changed(expected, preview)={changed}"
+
+
+def test_preview_rejects_unknown_form(client, roster):
+    response = post_preview(client, roster, "not_a_form")
+    assert response.status_code == 400
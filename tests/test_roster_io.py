@@ -0,0 +1,126 @@
+"""roster_io.read_roster must give the processors the same strings the old full read did."""
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+import roster_io
+from admission import AdmissionRejected
+from roster_io import ROSTER_COLUMNS, RosterError, read_roster
+
+
+@pytest.fixture
+def export(roster):
+    # A wide export: roster columns, filler columns and values that trip up CSV parsers
+    df = roster.copy()
+    df.loc[0, "Street"] = "12 Main St, Unit 4"
+    df.loc[1, "City"] = "NA"
+    df.loc[2, "AttendeeName"] = '"Quoted" , Name'
+    for c in range(10):
+        df[f"Extra{c}"] = f"extra {c}"
+    return df
+
+
+def old_read(csv_bytes):
+    return pd.read_csv(io.BytesIO(csv_bytes), dtype=str).fillna("")
+
+
+def assert_same_roster(df, expected):
+    expected = expected[[c for c in expected.columns if c in ROSTER_COLUMNS]]
+    assert list(df.columns) == list(expected.columns)
+    assert df.values.tolist() == expected.values.tolist()
+
+
+def test_csv_matches_full_read(export):
+    csv_bytes = export.to_csv(index=False).encode()
+    assert_same_roster(read_roster(io.BytesIO(csv_bytes)), old_read(csv_bytes))
+
+
+def test_digit_only_phones_keep_their_text(export):
+    # A type-guessing parser would turn these into 416555000 and 9055550000.0
+    export["AttendeePhone"] = "9055550000"
+    export.loc[0, "AttendeePhone"] = "0416555000"
+    export.loc[1, "AttendeePhone"] = ""
+    export.loc[2, "PostalCode"] = "01234"
+    csv_bytes = export.to_csv(index=False).encode()
+    df = read_roster(io.BytesIO(csv_bytes))
+    assert df["AttendeePhone"].tolist()[:3] == ["0416555000", "", "9055550000"]
+    assert df.loc[2, "PostalCode"] == "01234"
+    assert_same_roster(df, old_read(csv_bytes))
+
+    compact = export[[c for c in export.columns if c in ROSTER_COLUMNS]].to_csv(index=False).encode()
+    assert_same_roster(read_roster(io.BytesIO(gzip.compress(compact))), old_read(csv_bytes))
+
+
+def test_gzip_csv(export):
+    csv_bytes = export.to_csv(index=False).encode()
+    assert_same_roster(read_roster(io.BytesIO(gzip.compress(csv_bytes))), old_read(csv_bytes))
+
+
+def test_compacted_csv(export):
+    # What the upload page sends: only the roster columns, gzipped
+    compact = export[[c for c in export.columns if c in ROSTER_COLUMNS]].to_csv(index=False).encode()
+    csv_bytes = export.to_csv(index=False).encode()
+    assert_same_roster(read_roster(io.BytesIO(gzip.compress(compact))), old_read(csv_bytes))
+
+
+def test_xlsx(export):
+    pytest.importorskip("openpyxl")
+    buf = io.BytesIO()
+    export.to_excel(buf, index=False)
+    csv_bytes = export.to_csv(index=False).encode()
+    assert_same_roster(read_roster(io.BytesIO(buf.getvalue())), old_read(csv_bytes))
+
+
+def test_parquet(export):
+    pytest.importorskip("pyarrow")
+    buf = io.BytesIO()
+    export.to_parquet(buf, index=False)
+    csv_bytes = export.to_csv(index=False).encode()
+    assert_same_roster(read_roster(io.BytesIO(buf.getvalue())), old_read(csv_bytes))
+
+
+def test_typed_parquet_columns_read_as_csv_text():
+    pytest.importorskip("pyarrow")
+    typed = pd.DataFrame({
+        "AttendeeName": ["Chen , Li", None],
+        "AttendeePhone": [9055550000, None],
+        "DateOfBirth": pd.to_datetime(["1995-01-03", None]),
+    })
+    buf = io.BytesIO()
+    typed.to_parquet(buf, index=False)
+    df = read_roster(io.BytesIO(buf.getvalue()))
+    assert df.values.tolist() == [["Chen , Li", "9055550000", "1995-01-03"], ["", "", ""]]
+
+
+def test_missing_columns_are_left_out(export):
+    # Processors fall back to their own defaults (e.g. Province "ON") for absent columns
+    csv_bytes = export.drop(columns=["Province"]).to_csv(index=False).encode()
+    assert "Province" not in read_roster(io.BytesIO(csv_bytes)).columns
+
+
+def test_no_roster_columns():
+    with pytest.raises(RosterError):
+        read_roster(io.BytesIO(b"Foo,Bar\n1,2\n"))
+
+
+def test_gzip_output_is_bounded(export, monkeypatch):
+    monkeypatch.setattr(roster_io, "MAX_ROSTER_BYTES", 1024)
+    csv_bytes = export.to_csv(index=False).encode()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        read_roster(io.BytesIO(gzip.compress(csv_bytes)))
+    assert excinfo.value.status == 413
+
+
+def test_windows_1252_csv_keeps_accents():
+    csv_bytes = "AttendeeName,City\nÉmilie Côté,Montréal\n".encode("cp1252")
+    df = read_roster(io.BytesIO(csv_bytes))
+    assert df.loc[0, "AttendeeName"] == "Émilie Côté"
+    assert df.loc[0, "City"] == "Montréal"
+
+
+def test_undecodable_csv_is_a_roster_error():
+    # 0x81 is neither valid UTF-8 here nor assigned in Windows-1252
+    with pytest.raises(RosterError):
+        read_roster(io.BytesIO(b"AttendeeName\nA\x81B\n"))
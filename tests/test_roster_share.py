@@ -0,0 +1,52 @@
+"""roster_share: workers must read back exactly the rows that were packed."""
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import roster_share
+
+
+def worker_rows(handle, start, stop):
+    return roster_share.attach_roster(handle).rows(start, stop).values.tolist()
+
+
+@pytest.fixture
+def packed(roster):
+    with roster_share.pack_roster(roster) as packed:
+        yield packed
+        roster_share.detach_all()
+
+
+def test_worker_reads_its_row_range(roster, packed):
+    ranges = [(start, min(start + 8, len(roster))) for start in range(0, len(roster), 8)]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(worker_rows, *zip(*[(packed.handle, a, b) for a, b in ranges])))
+    assert results == [roster.iloc[a:b].values.tolist() for a, b in ranges]
+
+
+def test_rows_match_the_roster(roster, packed):
+    rows = roster_share.attach_roster(packed.handle).rows(3, 11)
+    assert list(rows.columns) == list(roster.columns)
+    assert rows.values.tolist() == roster.iloc[3:11].values.tolist()
+    assert packed.handle.rows == len(roster)
+
+
+def test_attachment_is_reused(packed):
+    assert roster_share.attach_roster(packed.handle) is roster_share.attach_roster(packed.handle)
+
+
+def test_block_is_removed_on_close(roster):
+    with roster_share.pack_roster(roster) as packed:
+        handle = packed.handle
+    with pytest.raises(FileNotFoundError):
+        roster_share.SharedRoster(handle)
+
+
+def read_whole(handle):
+    return roster_share.read_packed(handle).values.tolist()
+
+
+def test_read_packed_copies_the_whole_roster(roster, packed):
+    # What the ASGI pool's workers do with a job's roster
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(read_whole, packed.handle).result() == roster.values.tolist()
@@ -0,0 +1,41 @@
+"""Candidates-per-second floors for each processor on the shared test roster.
+
+Floors sit well under what a laptop does today so only real regressions trip
+them. Scale them for slower/faster machines with THROUGHPUT_FLOOR_SCALE
+(e.g. 0.5), or set it to 0 to skip the check.
+"""
+import os
+
+import pytest
+
+from app import FORM_CONFIG
+from conftest import ROSTER_SIZE
+
+FLOOR_SCALE = float(os.environ.get("THROUGHPUT_FLOOR_SCALE", "1"))
+
+# candidates / second
+THROUGHPUT_FLOORS = {
+    "efa": 3.5,
+    "bronze_med": 1.5,
+    "bronze_cross": 1.5,
+    "bronze_star": 2.0,
+    "sfa": 3.5,
+    "airway_management": 5.0,
+    "national_lifeguard": 1.5,
+    "nl_recert": 3.0,
+    "leadership_mastersheet": 5.0,
+}
+
+
+def test_every_form_has_a_floor():
+    assert set(THROUGHPUT_FLOORS) == set(FORM_CONFIG)
+
+
+@pytest.mark.parametrize("output_runs", ["full"], indirect=True)
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+def test_throughput_floor(form_type, output_runs):
+    if FLOOR_SCALE == 0:
+        pytest.skip("THROUGHPUT_FLOOR_SCALE=0")
+    rate = ROSTER_SIZE / output_runs[form_type]["elapsed"]
+    floor = THROUGHPUT_FLOORS[form_type] * FLOOR_SCALE
+    assert rate >= floor, f"{form_type}: {rate:.1f} candidates/s is below the floor of {floor:.1f}"
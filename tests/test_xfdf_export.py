@@ -0,0 +1,95 @@
+"""XFDF data-only export: rehydrating it must give back the golden PDFs.
+
+The export is planned from the same FORM_CONFIG slot mappings as the PDFs, so
+rebuilt files are compared with the same snapshots as test_golden_outputs.py.
+"""
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from app import FORM_CONFIG, TEMPLATE_FOLDER, app
+from conftest import GOLDEN_DIR, ROOT, read_filled_values
+from xfdf_export import MANIFEST_NAME, export_batches, read_xfdf, rehydrate
+
+TEMPLATES = os.path.join(ROOT, TEMPLATE_FOLDER)
+
+
+@pytest.mark.parametrize("form_type", list(FORM_CONFIG))
+def test_rehydrated_pdfs_match_golden(form_type, roster, tmp_path):
+    config = FORM_CONFIG[form_type]
+    export_folder, pdf_folder = tmp_path / "xfdf", tmp_path / "pdf"
+    export_folder.mkdir()
+    written = export_batches(config["plan"](roster.copy()), os.path.join(TEMPLATES, config["filename"]),
+                             str(export_folder), form_type)
+
+    # Data only: a few KB per sheet against hundreds of KB for the PDF
+    assert all(os.path.getsize(path) < 20 * 1024 for path in written)
+
+    rebuilt = rehydrate(str(export_folder), str(pdf_folder), TEMPLATES)
+    with open(os.path.join(GOLDEN_DIR, f"{form_type}.json")) as f:
+        expected = json.load(f)
+    assert {os.path.basename(p): read_filled_values(p) for p in rebuilt} == expected
+
+
+def test_rehydrate_refuses_a_different_template(roster, tmp_path):
+    config = FORM_CONFIG["efa"]
+    export_batches(config["plan"](roster.copy()), os.path.join(TEMPLATES, config["filename"]), str(tmp_path), "efa")
+    manifest_path = tmp_path / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text())
+    manifest["template"]["sha256"] = "0" * 64
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError):
+        rehydrate(str(tmp_path), str(tmp_path / "pdf"), TEMPLATES)
+
+
+@pytest.mark.parametrize("key", ["xfdf", "pdf"])
+@pytest.mark.parametrize("name", ["../escaped.pdf", "/tmp/escaped.pdf", "sub/escaped.pdf", ".."])
+def test_rehydrate_refuses_paths_in_the_manifest(roster, tmp_path, key, name):
+    config = FORM_CONFIG["efa"]
+    export_folder = tmp_path / "xfdf"
+    export_folder.mkdir()
+    export_batches(config["plan"](roster.copy()), os.path.join(TEMPLATES, config["filename"]),
+                   str(export_folder), "efa")
+    manifest_path = export_folder / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text())
+    manifest["files"][0][key] = name
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError):
+        rehydrate(str(export_folder), str(tmp_path / "pdf" / "out"), TEMPLATES)
+    assert not (tmp_path / "pdf" / "escaped.pdf").exists()
+
+
+def test_endpoint_returns_xfdf_zip(roster, tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    csv_bytes = roster.to_csv(index=False).encode()
+    response = app.test_client().post("/", data={
+        "form_type": "bronze_med",
+        "output_format": "xfdf",
+        "csv_file": (io.BytesIO(csv_bytes), "roster.csv"),
+    })
+    assert response.status_code == 200
+
+    with zipfile.ZipFile(io.BytesIO(response.data)) as zipf:
+        names = zipf.namelist()
+        assert MANIFEST_NAME in names
+        assert not [n for n in names if n.endswith(".pdf")]
+        first = next(n for n in names if n.endswith(".xfdf"))
+        assert read_xfdf(zipf.open(first))
+
+    zip_path = tmp_path / "export.zip"
+    zip_path.write_bytes(response.data)
+    assert len(rehydrate(str(zip_path), str(tmp_path / "pdf"), TEMPLATES)) == len(names) - 1
+
+
+def test_endpoint_rejects_unknown_output_format(roster):
+    response = app.test_client().post("/", data={
+        "form_type": "efa",
+        "output_format": "docx",
+        "csv_file": (io.BytesIO(roster.to_csv(index=False).encode()), "roster.csv"),
+    })
+    assert response.status_code == 400
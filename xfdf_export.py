@@ -0,0 +1,192 @@
+"""Data-only output: one XFDF file per batch instead of a filled PDF.
+
+An XFDF file holds just the filled values (a few KB) and the name of the
+template it belongs to, so a season's archive doesn't store the same template
+bytes hundreds of times. The values come from the same FORM_CONFIG plan as the
+PDFs. They are resolved to the fully qualified names of the fields they fill,
+so Acrobat can also import the file onto the blank template directly.
+
+Alongside the XFDF files, manifest.json records what rehydration needs to
+rebuild the exact PDFs: the template's file name and SHA-256, and each batch's
+render options (copy_layers, drop_pages).
+
+Rehydrate an archive (the downloaded ZIP or an unpacked folder) with
+    python xfdf_export.py Filled_Forms.zip out_folder [--templates templates_pdf]
+"""
+import argparse
+import hashlib
+import json
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+from form_logic import save_filled_pdf
+from incremental_writer import load_template, matching_widgets
+
+XFDF_NS = "http://ns.adobe.com/xfdf/"
+MANIFEST_NAME = "manifest.json"
+
+
+def template_sha256(template_path):
+    digest = hashlib.sha256()
+    with open(template_path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- WRITING ---
+def resolve_fields(template, data_map, drop_pages=()):
+    """Qualified field name -> value, exactly as the PDF writers would fill them."""
+    kept_pages = [i for i in range(len(template.widgets)) if i not in set(drop_pages)]
+    values = {}
+    for _, _, qualified, field_type, value in matching_widgets(template, data_map, kept_pages):
+        if field_type == "/Btn" and value.startswith("/"):
+            value = value[1:]  # XFDF writes button states without the name slash
+        values[qualified] = value  # later keys win, as in the PDF writers
+    return values
+
+
+def _add_fields(parent, values):
+    # XFDF nests dotted names: "1.4" -> <field name="1"><field name="4">
+    nodes = {}
+    for name, value in values.items():
+        element, scope = parent, nodes
+        for part in name.split("."):
+            if part not in scope:
+                scope[part] = (ET.SubElement(element, "field", name=part), {})
+            element, scope = scope[part]
+        ET.SubElement(element, "value").text = value
+
+
+def write_xfdf(template_path, data_map, out_path, drop_pages=()):
+    template = load_template(template_path)
+    root = ET.Element("xfdf", {"xmlns": XFDF_NS, "xml:space": "preserve"})
+    ET.SubElement(root, "f", href=os.path.basename(template_path))
+    with template.lock:
+        ids = template.reader.trailer.get("/ID")
+    if ids:
+        ET.SubElement(root, "ids", original=ids[0].original_bytes.hex().upper(),
+                      modified=ids[1].original_bytes.hex().upper())
+    _add_fields(ET.SubElement(root, "fields"), resolve_fields(template, data_map, drop_pages))
+    ET.ElementTree(root).write(out_path, encoding="UTF-8", xml_declaration=True)
+
+
+def export_batches(batches, template_path, output_folder, form_type):
+    """Writes an XFDF per batch plus manifest.json; returns the written paths."""
+    written, files = [], []
+    for batch in batches:
+        pdf_name = batch["filename"]
+        xfdf_name = os.path.splitext(pdf_name)[0] + ".xfdf"
+        out_path = os.path.join(output_folder, xfdf_name)
+        write_xfdf(template_path, batch["data_map"], out_path, drop_pages=batch["drop_pages"])
+        written.append(out_path)
+        files.append({
+            "xfdf": xfdf_name,
+            "pdf": pdf_name,
+            "copy_layers": batch["copy_layers"],
+            "drop_pages": list(batch["drop_pages"]),
+        })
+
+    manifest = {
+        "format": "xfdf",
+        "form_type": form_type,
+        "template": {"filename": os.path.basename(template_path), "sha256": template_sha256(template_path)},
+        "files": files,
+    }
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    written.append(manifest_path)
+    return written
+
+
+# --- REHYDRATION ---
+def read_xfdf(source):
+    """Qualified field name -> value from an XFDF file (path or file object)."""
+    values = {}
+
+    def walk(element, prefix):
+        for field in element.findall(f"{{{XFDF_NS}}}field"):
+            name = f"{prefix}.{field.get('name')}" if prefix else field.get("name")
+            value = field.find(f"{{{XFDF_NS}}}value")
+            if value is not None:
+                values[name] = value.text or ""
+            walk(field, name)
+
+    fields = ET.parse(source).getroot().find(f"{{{XFDF_NS}}}fields")
+    if fields is not None:
+        walk(fields, "")
+    return values
+
+
+def to_data_map(template, values):
+    """Puts the name slash back on button values that are appearance states of their widget.
+
+    Anything else (e.g. candidate numbers typed into a button field) stays a
+    plain string, which is how the plan wrote it.
+    """
+    states = {}
+    with template.lock:
+        for page in template.widgets:
+            for widget_ref, _, qualified, _, field_type in page:
+                if field_type == "/Btn":
+                    appearances = widget_ref.get_object().get("/AP", {})
+                    states.setdefault(qualified, set()).update(appearances.get("/N", {}).keys())
+    return {name: f"/{value}" if f"/{value}" in states.get(name, ()) else value
+            for name, value in values.items()}
+
+
+def _plain_name(name):
+    # Names come from the archive's manifest: refuse anything that could leave its folder
+    if not isinstance(name, str) or not name or os.path.basename(name) != name or name in (".", ".."):
+        raise ValueError(f"Manifest names must be plain file names, not {name!r}.")
+    return name
+
+
+def rehydrate(source, out_folder, template_folder="templates_pdf"):
+    """Rebuilds the full PDFs of an XFDF export (ZIP or folder); returns their paths."""
+    if zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        open_member = archive.open
+    else:
+        archive = None
+        open_member = lambda name: open(os.path.join(source, name), "rb")  # noqa: E731
+
+    try:
+        with open_member(MANIFEST_NAME) as f:
+            manifest = json.load(f)
+        template_path = os.path.join(template_folder, _plain_name(manifest["template"]["filename"]))
+        if not os.path.exists(template_path):
+            raise FileNotFoundError(f"Template PDF not found: {template_path}")
+        if template_sha256(template_path) != manifest["template"]["sha256"]:
+            raise ValueError(f"{template_path} is not the template this archive was made from (SHA-256 differs).")
+
+        template = load_template(template_path)
+        os.makedirs(out_folder, exist_ok=True)
+        generated = []
+        for entry in manifest["files"]:
+            with open_member(_plain_name(entry["xfdf"])) as f:
+                data_map = to_data_map(template, read_xfdf(f))
+            out_path = os.path.join(out_folder, _plain_name(entry["pdf"]))
+            save_filled_pdf(template_path, data_map, out_path,
+                            copy_layers=entry["copy_layers"], drop_pages=tuple(entry["drop_pages"]))
+            generated.append(out_path)
+        return generated
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild full PDFs from an XFDF data-only export.")
+    parser.add_argument("source", help="the export ZIP, or a folder holding manifest.json and the .xfdf files")
+    parser.add_argument("out_folder")
+    parser.add_argument("--templates", default="templates_pdf", help="folder with the blank template PDFs")
+    args = parser.parse_args()
+    for path in rehydrate(args.source, args.out_folder, args.templates):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()